@@ -22,6 +22,9 @@
         'mail',
         'web',
     ],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         # Security
         'security/security.xml',
@@ -29,16 +32,30 @@
 
         # Data
         'data/sequence.xml',
+        'data/mail_activity_data.xml',
+        'data/it_asset_sla_data.xml',
+        'data/ir_cron.xml',
 
         # Views
         'views/it_asset_category_views.xml',
         'views/it_asset_views.xml',
         'views/it_asset_request_views.xml',
         'views/it_asset_movement_views.xml',
+        'views/it_asset_custody_views.xml',
+        'views/it_asset_transition_views.xml',
+        'views/it_asset_inventory_views.xml',
+        'views/it_asset_import_views.xml',
+        'views/it_asset_allocation_views.xml',
+        'views/it_asset_archive_views.xml',
         'views/portal_templates.xml',
         'views/it_asset_reports.xml',
+        'views/it_asset_labels.xml',
         'views/menus.xml',
 
+        # Wizards
+        'wizard/it_asset_reassign_wizard_views.xml',
+        'wizard/it_asset_dataset_wizard_views.xml',
+
         # Demo Data
         'data/demo_data.xml',
     ],
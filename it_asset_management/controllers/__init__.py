@@ -1 +1,4 @@
 from . import portal
+from . import scanner
+from . import export
+from . import perf
@@ -0,0 +1,158 @@
+import csv
+import io
+import tempfile
+
+from odoo import http, api, fields, _
+from odoo.http import request, Response
+from odoo.modules.registry import Registry
+from odoo.exceptions import AccessError
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+#Кількість активів, що читаються з БД за один раз
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ITAssetExport(http.Controller):
+    """
+    Потоковий експорт реєстру активів з історією переміщень.
+    Активи читаються пакетами по id (без OFFSET), кеш очищується після
+    кожного пакета, а рядки віддаються у відповідь генератором,
+    тому пам'ять воркера не залежить від розміру реєстру.
+    """
+
+    @staticmethod
+    def _header():
+        return [
+            _('Інвентарний номер'), _('Назва'), _('Категорія'), _('Серійний номер'),
+            _('Виробник'), _('Модель'), _('Статус'), _('Співробітник'),
+            _('Дата призначення'), _('Дата придбання'), _('Ціна придбання'),
+            _('Гарантія до'), _('Історія переміщень'),
+        ]
+
+    @staticmethod
+    def _iter_rows(env, include_archived=False):
+        """Рядки реєстру пакетами по EXPORT_CHUNK_SIZE активів"""
+        Asset = env['it.asset'].with_context(active_test=not include_archived)
+        Movement = env['it.asset.movement']
+        states = dict(Asset._fields['state']._description_selection(env))
+        last_id = 0
+        while True:
+            assets = Asset.search_fetch(
+                [('id', '>', last_id)],
+                ['code', 'name', 'category_id', 'serial_number', 'manufacturer', 'model',
+                 'state', 'employee_id', 'assignment_date', 'purchase_date',
+                 'purchase_price', 'warranty_end_date'],
+                order='id',
+                limit=EXPORT_CHUNK_SIZE,
+            )
+            if not assets:
+                break
+            last_id = assets[-1].id
+
+            #Назви категорій і співробітників - одним запитом на пакет
+            assets.category_id.fetch(['complete_name'])
+            assets.employee_id.fetch(['name'])
+
+            #Історія переміщень для всього пакета одним запитом
+            history = {}
+            movements = Movement.search_fetch(
+                [('asset_id', 'in', assets.ids)],
+                ['asset_id', 'movement_date', 'previous_employee_id', 'employee_id'],
+                order='asset_id, movement_date, id',
+            )
+            movements.previous_employee_id.fetch(['name'])
+            movements.employee_id.fetch(['name'])
+            for movement in movements:
+                history.setdefault(movement.asset_id.id, []).append('%s: %s → %s' % (
+                    movement.movement_date,
+                    movement.previous_employee_id.name or _('склад'),
+                    movement.employee_id.name,
+                ))
+
+            for asset in assets:
+                yield [
+                    asset.code, asset.name, asset.category_id.complete_name,
+                    asset.serial_number or '', asset.manufacturer or '', asset.model or '',
+                    states.get(asset.state, asset.state), asset.employee_id.name or '',
+                    fields.Date.to_string(asset.assignment_date) or '',
+                    fields.Date.to_string(asset.purchase_date) or '',
+                    asset.purchase_price,
+                    fields.Date.to_string(asset.warranty_end_date) or '',
+                    '; '.join(history.get(asset.id, [])),
+                ]
+            env.invalidate_all()
+
+    def _stream(self, writer, include_archived):
+        """
+        Генератор відповіді з власним курсором: курсор запиту закривається
+        до того, як werkzeug почне читати тіло відповіді.
+        """
+        dbname, uid, context = request.db, request.env.uid, dict(request.env.context)
+
+        def generate():
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from writer(env, include_archived)
+        return generate()
+
+    def _check_access(self):
+        if not request.env.user.has_group('it_asset_management.group_it_asset_user'):
+            raise AccessError(_('Експорт реєстру доступний тільки співробітникам IT.'))
+
+    def _write_csv(self, env, include_archived):
+        """CSV: кожен пакет рядків одразу віддається клієнту"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self._header())
+        for index, row in enumerate(self._iter_rows(env, include_archived), 1):
+            writer.writerow(row)
+            if index % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _write_xlsx(self, env, include_archived):
+        """XLSX: xlsxwriter в режимі constant_memory пише у тимчасовий файл, файл віддається частинами"""
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as tmp:
+            workbook = xlsxwriter.Workbook(tmp.name, {'constant_memory': True})
+            sheet = workbook.add_worksheet(_('Активи'))
+            sheet.write_row(0, 0, self._header())
+            for index, row in enumerate(self._iter_rows(env, include_archived), 1):
+                sheet.write_row(index, 0, row)
+            workbook.close()
+            with open(tmp.name, 'rb') as stream:
+                while chunk := stream.read(64 * 1024):
+                    yield chunk
+
+    @http.route('/it_asset/export/assets.csv', type='http', auth='user')
+    def export_assets_csv(self, archived=None, **kw):
+        """Потоковий CSV експорт реєстру активів"""
+        self._check_access()
+        return Response(
+            self._stream(self._write_csv, bool(archived)),
+            headers=[
+                ('Content-Type', 'text/csv; charset=utf-8'),
+                ('Content-Disposition', 'attachment; filename="it_assets.csv"'),
+            ],
+            direct_passthrough=True,
+        )
+
+    @http.route('/it_asset/export/assets.xlsx', type='http', auth='user')
+    def export_assets_xlsx(self, archived=None, **kw):
+        """XLSX експорт реєстру активів"""
+        self._check_access()
+        if xlsxwriter is None:
+            return request.not_found(_('Бібліотека xlsxwriter не встановлена.'))
+        return Response(
+            self._stream(self._write_xlsx, bool(archived)),
+            headers=[
+                ('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+                ('Content-Disposition', 'attachment; filename="it_assets.xlsx"'),
+            ],
+            direct_passthrough=True,
+        )
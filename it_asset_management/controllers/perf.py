@@ -0,0 +1,18 @@
+from odoo import http, _
+from odoo.http import request
+from odoo.exceptions import AccessError
+
+
+class ITAssetPerf(http.Controller):
+    """Агреговані виміри профілювання порталу та workflow (тільки для менеджерів)"""
+
+    @http.route('/it_asset/perf/stats', type='http', auth='user')
+    def perf_stats(self, hours=24, **kw):
+        """Перцентилі p50/p90/p99 часу і кількості запитів по кожному виклику"""
+        if not request.env.user.has_group('it_asset_management.group_it_asset_manager'):
+            raise AccessError(_('Статистика продуктивності доступна тільки менеджерам.'))
+        try:
+            hours = int(hours)
+        except ValueError:
+            hours = 24
+        return request.make_json_response(request.env['it.asset.perf.sample']._get_statistics(hours=hours))
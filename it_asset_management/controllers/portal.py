@@ -1,8 +1,16 @@
-from odoo import http, _
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from odoo import http, fields, _
 from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal, pager as portal_pager
 from odoo.exceptions import AccessError, MissingError
+from odoo.osv import expression
 from odoo.tools import groupby as groupbyelem
+from odoo.addons.it_asset_management.models.it_asset import TEXT_SEARCH_FIELDS
+from odoo.addons.it_asset_management.models.it_asset_perf import instrument
 from operator import itemgetter
 
 
@@ -12,73 +20,211 @@ class ITAssetPortal(CustomerPortal):
     Надає співробітникам доступ до їх активів і заявок через портал.
     """
     
+    @http.route()
+    @instrument
+    def home(self, **kw):
+        """Головна сторінка порталу (для профілювання)"""
+        return super().home(**kw)
+
     def _prepare_home_portal_values(self, counters):
         """Додає кількість активів і заявок на головну сторінку порталу"""
         values = super()._prepare_home_portal_values(counters)
         partner = request.env.user.partner_id
         
-        if 'asset_count' in counters:
-            asset_count = request.env['it.asset'].search_count([
-                ('employee_id', '=', partner.id),
-                ('state', 'in', ['assigned', 'in_use'])
-            ])
-            values['asset_count'] = asset_count
+        #Лічильники зберігаються на партнері і оновлюються при зміні активів/заявок
+        if 'it_asset_count' in counters:
+            values['it_asset_count'] = partner.it_asset_count
         
-        if 'request_count' in counters:
-            request_count = request.env['it.asset.request'].search_count([
-                ('requester_id', '=', partner.id)
-            ])
-            values['request_count'] = request_count
+        if 'it_asset_request_count' in counters:
+            values['it_asset_request_count'] = partner.it_asset_request_count
         
         return values
     
+    #Keyset (cursor) пагінація
+
+    @staticmethod
+    def _encode_cursor(record, field_name):
+        """Курсор = (значення поля сортування, id) у вигляді url-safe рядка"""
+        value = record[field_name]
+        if value and record._fields[field_name].type == 'date':
+            value = fields.Date.to_string(value)
+        payload = json.dumps([value or None, record.id]).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        """Розбір курсора; некоректний курсор означає першу сторінку"""
+        try:
+            value, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return value, int(record_id)
+        except (ValueError, TypeError, binascii.Error):
+            return None
+
+    @staticmethod
+    def _keyset_domain(field_name, descending, value, record_id):
+        """
+        Домен "записи після (value, id)" для ORDER BY field, id.
+        PostgreSQL ставить NULL першими для DESC і останніми для ASC.
+        """
+        after = '<' if descending else '>'
+        if value is None:
+            tail = [(field_name, '=', False), ('id', after, record_id)]
+            return expression.OR([tail, [(field_name, '!=', False)]]) if descending else tail
+        domain = expression.OR([
+            [(field_name, after, value)],
+            [(field_name, '=', value), ('id', after, record_id)],
+        ])
+        if not descending:
+            domain = expression.OR([domain, [(field_name, '=', False)]])
+        return domain
+
+    def _keyset_search(self, Model, domain, field_name, descending, after=None, before=None, url='', url_args=None, total=None):
+        """
+        Пошук сторінки записів без OFFSET.
+        Вартість будь-якої сторінки однакова - індексний пошук від курсора + LIMIT.
+        """
+        limit = self._items_per_page
+        backwards = bool(before) and not after
+        cursor = self._decode_cursor(after or before or '')
+        #Для попередньої сторінки йдемо у зворотному порядку, потім перевертаємо
+        reverse = descending != backwards
+        direction = 'desc' if reverse else 'asc'
+        order = '%s %s, id %s' % (field_name, direction, direction)
+
+        search_domain = domain
+        if cursor:
+            search_domain = expression.AND([
+                domain, self._keyset_domain(field_name, reverse, *cursor)
+            ])
+        records = Model.search(search_domain, order=order, limit=limit + 1)
+        has_more = len(records) > limit
+        records = records[:limit]
+        if backwards:
+            records = records[::-1]
+
+        url_args = dict(url_args or {})
+        has_next = has_more if not backwards else True
+        has_prev = bool(cursor) and (has_more if backwards else True)
+        keyset_pager = {
+            'next_url': has_next and records and '%s?%s' % (url, urlencode(
+                dict(url_args, after=self._encode_cursor(records[-1], field_name)))),
+            'prev_url': has_prev and records and '%s?%s' % (url, urlencode(
+                dict(url_args, before=self._encode_cursor(records[0], field_name)))),
+            'first_url': cursor and '%s?%s' % (url, urlencode(url_args)),
+            'count_url': total is None and '%s?%s' % (url, urlencode(dict(url_args, count=1))),
+            'total': total,
+        }
+        return records, keyset_pager
+
     @http.route(['/my/assets', '/my/assets/page/<int:page>'], type='http', auth="user", website=True)
-    def portal_my_assets(self, page=1, sortby=None, filterby=None, **kw):
+    @instrument
+    def portal_my_assets(self, page=1, sortby=None, filterby=None, after=None, before=None, count=None,
+                         search=None, search_in='all', **kw):
         """Відображає список активів закріплених за співробітником"""
         values = self._prepare_portal_layout_values()
-        partner = request.env.user.partner_id
         ITAsset = request.env['it.asset']
 
         domain = []
         
-        #Сортування
+        #Сортування (keyset - поле для курсорної пагінації і напрям)
         searchbar_sortings = {
-            'date': {'label': _('Дата призначення'), 'order': 'assignment_date desc'},
-            'name': {'label': _('Назва'), 'order': 'name'},
+            'date': {'label': _('Дата призначення'), 'order': 'assignment_date desc', 'keyset': ('assignment_date', True)},
+            'name': {'label': _('Назва'), 'order': 'name', 'keyset': ('name', False)},
             'category': {'label': _('Категорія'), 'order': 'category_id'},
         }
         
-        if not sortby:
+        if sortby not in searchbar_sortings:
             sortby = 'date'
         order = searchbar_sortings[sortby]['order']
-        
-        #Підрахунок
-        asset_count = ITAsset.search_count(domain)
-        
-        #Пагінація
-        pager = portal_pager(
-            url="/my/assets",
-            url_args={},
-            total=asset_count,
-            page=page,
-            step=self._items_per_page
-        )
-        
-        #Пошук активів
-        assets = ITAsset.search(domain, order=order, limit=self._items_per_page, offset=pager['offset'])
+        keyset = searchbar_sortings[sortby].get('keyset')
+
+        #Поля пошуку (кожне має власний trigram індекс)
+        searchbar_inputs = {
+            'all': {'input': 'all', 'label': _('Назва, серійний номер, модель'), 'fields': TEXT_SEARCH_FIELDS},
+            'name': {'input': 'name', 'label': _('Назва'), 'fields': ('name',)},
+            'serial_number': {'input': 'serial_number', 'label': _('Серійний номер'), 'fields': ('serial_number',)},
+            'manufacturer': {'input': 'manufacturer', 'label': _('Виробник'), 'fields': ('manufacturer',)},
+            'model': {'input': 'model', 'label': _('Модель'), 'fields': ('model',)},
+        }
+        if search_in not in searchbar_inputs:
+            search_in = 'all'
+
+        pager = keyset_pager = False
+        if search:
+            #Ранжований пошук по trigram індексах, найкращі збіги без пагінації
+            assets = ITAsset._search_ranked(search, domain, field_names=searchbar_inputs[search_in]['fields'])
+        elif keyset:
+            #Загальна кількість рахується тільки на вимогу (?count=1)
+            asset_count = ITAsset.search_count(domain) if count else None
+            assets, keyset_pager = self._keyset_search(
+                ITAsset, domain, *keyset, after=after, before=before,
+                url='/my/assets', url_args={'sortby': sortby}, total=asset_count,
+            )
+        else:
+            #Пагінація через OFFSET для сортування по категорії
+            asset_count = ITAsset.search_count(domain)
+            pager = portal_pager(
+                url="/my/assets",
+                url_args={'sortby': sortby},
+                total=asset_count,
+                page=page,
+                step=self._items_per_page
+            )
+            assets = ITAsset.search(domain, order=order, limit=self._items_per_page, offset=pager['offset'])
         
         values.update({
             'assets': assets,
             'page_name': 'asset',
             'pager': pager,
+            'keyset_pager': keyset_pager,
             'default_url': '/my/assets',
             'searchbar_sortings': searchbar_sortings,
+            'searchbar_inputs': searchbar_inputs,
+            'search_in': search_in,
+            'search': search,
             'sortby': sortby,
         })
         
         return request.render("it_asset_management.portal_my_assets", values)
     
+    @http.route(['/my/assets/as-of'], type='http', auth="user", website=True)
+    @instrument
+    def portal_my_assets_as_of(self, date=None, **kw):
+        """Активи, закріплені за співробітником на вказану дату (за інтервалами володіння)"""
+        values = self._prepare_portal_layout_values()
+        partner = request.env.user.partner_id
+        try:
+            day = fields.Date.to_date(date) or fields.Date.context_today(request.env.user)
+        except ValueError:
+            day = fields.Date.context_today(request.env.user)
+
+        #Інтервали тільки цього партнера, тому читання активів через sudo безпечне
+        Custody = request.env['it.asset.custody'].sudo()
+        periods = {
+            asset_id: (valid_from, valid_to)
+            for asset_id, __, valid_from, valid_to in Custody._held_at(day, partner_ids=partner.ids)
+        }
+        assets = request.env['it.asset'].sudo().with_context(active_test=False).search_fetch(
+            [('id', 'in', list(periods))], ['code', 'name', 'category_id', 'employee_id'], order='code',
+        )
+        #Списані активи, перенесені в архів, теж входять у відповідь на дату
+        archived = request.env['it.asset.archive'].sudo().search_fetch(
+            [('res_id', 'in', list(set(periods) - set(assets.ids)))], ['res_id', 'code', 'name', 'category_id'],
+            order='code',
+        )
+
+        values.update({
+            'assets': assets,
+            'archived': archived,
+            'periods': periods,
+            'partner': partner,
+            'as_of': day,
+            'page_name': 'asset',
+        })
+        return request.render("it_asset_management.portal_my_assets_as_of", values)
+
     @http.route(['/my/asset/<int:asset_id>'], type='http', auth="user", website=True)
+    @instrument
     def portal_my_asset(self, asset_id, **kw):
         """Відображає детальну інформацію про конкретний актив"""
         try:
@@ -93,8 +239,9 @@ class ITAssetPortal(CustomerPortal):
         
         return request.render("it_asset_management.portal_my_asset", values)
     
-    @http.route(['/my/asset-requests', '/my/asset-requests/page/<int:page>'], type='http', auth="user", website=True)
-    def portal_my_requests(self, page=1, sortby=None, filterby=None, **kw):
+    @http.route(['/my/asset-requests'], type='http', auth="user", website=True)
+    @instrument
+    def portal_my_requests(self, sortby=None, filterby=None, after=None, before=None, count=None, **kw):
         """Відображає список заявок співробітника"""
         values = self._prepare_portal_layout_values()
         partner = request.env.user.partner_id
@@ -110,40 +257,36 @@ class ITAssetPortal(CustomerPortal):
             'done': {'label': _('Готово'), 'domain': [('state', '=', 'done')]},
         }
         
-        #Сортування
+        #Сортування (keyset - поле для курсорної пагінації і напрям)
         searchbar_sortings = {
-            'date': {'label': _('Дата заявки'), 'order': 'request_date desc'},
-            'name': {'label': _('Номер'), 'order': 'name'},
-            'state': {'label': _('Статус'), 'order': 'state'},
+            'date': {'label': _('Дата заявки'), 'order': 'request_date desc', 'keyset': ('request_date', True)},
+            'name': {'label': _('Номер'), 'order': 'name', 'keyset': ('name', False)},
+            'state': {'label': _('Статус'), 'order': 'state', 'keyset': ('state', False)},
         }
         
-        if not sortby:
+        if sortby not in searchbar_sortings:
             sortby = 'date'
-        if not filterby:
+        if filterby not in searchbar_filters:
             filterby = 'all'
         
-        order = searchbar_sortings[sortby]['order']
         domain += searchbar_filters[filterby]['domain']
         
-        #Підрахунок
-        request_count = ITAssetRequest.search_count(domain)
+        #Загальна кількість рахується тільки на вимогу (?count=1)
+        request_count = ITAssetRequest.search_count(domain) if count else None
         
-        #Пагінація
-        pager = portal_pager(
-            url="/my/asset-requests",
-            url_args={},
+        #Пошук заявок від курсора, без OFFSET
+        requests, keyset_pager = self._keyset_search(
+            ITAssetRequest, domain, *searchbar_sortings[sortby]['keyset'],
+            after=after, before=before,
+            url='/my/asset-requests', url_args={'sortby': sortby, 'filterby': filterby},
             total=request_count,
-            page=page,
-            step=self._items_per_page
         )
         
-        #Пошук заявок
-        requests = ITAssetRequest.search(domain, order=order, limit=self._items_per_page, offset=pager['offset'])
-        
         values.update({
             'requests': requests,
             'page_name': 'asset_request',
-            'pager': pager,
+            'pager': False,
+            'keyset_pager': keyset_pager,
             'default_url': '/my/asset-requests',
             'searchbar_sortings': searchbar_sortings,
             'searchbar_filters': searchbar_filters,
@@ -153,7 +296,14 @@ class ITAssetPortal(CustomerPortal):
         
         return request.render("it_asset_management.portal_my_requests", values)
 
+    @http.route(['/my/asset-requests/page/<int:page>'], type='http', auth="user", website=True)
+    def portal_my_requests_page(self, page=1, sortby=None, filterby=None, **kw):
+        """Старі посилання з номером сторінки ведуть на першу сторінку курсорної пагінації"""
+        url_args = {key: value for key, value in (('sortby', sortby), ('filterby', filterby)) if value}
+        return request.redirect('/my/asset-requests%s' % ('?%s' % urlencode(url_args) if url_args else ''))
+
     @http.route(['/my/asset-requests/<int:request_id>'], type='http', auth="user", website=True)
+    @instrument
     def portal_my_request(self, request_id, access_token=None, **kw):
         """Відображає детальну інформацію про конкретну заявку"""
         try:
@@ -174,14 +324,13 @@ class ITAssetPortal(CustomerPortal):
         return request.render("it_asset_management.portal_my_request", values)
     
     @http.route(['/my/asset-requests/new'], type='http', auth="user", website=True)
+    @instrument
     def portal_new_request(self, **kw):
         """Форма для створення нової заявки"""
         partner = request.env.user.partner_id
-        categories = request.env['it.asset.category'].search([])
-        assets = request.env['it.asset'].search([
-            ('employee_id', '=', partner.id),
-            ('state', 'in', ['assigned', 'in_use'])
-        ])
+        #Списки опцій з кешу: категорії - до зміни категорій, активи - до зміни закріплених активів
+        categories = request.env['it.asset.category']._portal_options()
+        assets = request.env['it.asset']._portal_request_options(partner)
         
         values = {
             'categories': categories,
@@ -192,6 +341,7 @@ class ITAssetPortal(CustomerPortal):
         return request.render("it_asset_management.portal_new_request", values)
     
     @http.route(['/my/asset-requests/create'], type='http', auth="user", website=True, methods=['POST'], csrf=True)
+    @instrument
     def portal_create_request(self, **post):
         """Створення нової заявки від співробітника"""
         partner = request.env.user.partner_id
@@ -222,6 +372,7 @@ class ITAssetPortal(CustomerPortal):
 
     @http.route(['/my/asset-requests/<int:request_id>/message'], type='http', auth="user", website=True,
                 methods=['POST'], csrf=True)
+    @instrument
     def portal_request_message(self, request_id, **post):
         """Додавання коментаря до заявки"""
         try:
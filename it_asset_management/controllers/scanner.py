@@ -0,0 +1,48 @@
+from odoo import http
+from odoo.http import request
+
+
+class ITAssetScanner(http.Controller):
+    """
+    JSON маршрути для сканерів штрихкодів / QR кодів.
+    Пошук виконується по унікальному інвентарному номеру або серійному номеру (індекси).
+    """
+
+    @staticmethod
+    def _asset_values(asset):
+        """Короткі дані активу для відповіді сканеру"""
+        return {
+            'id': asset.id,
+            'code': asset.code,
+            'name': asset.name,
+            'serial_number': asset.serial_number or False,
+            'state': asset.state,
+            'category': asset.category_id.display_name,
+            'employee': asset.employee_id.name or False,
+            'employee_id': asset.employee_id.id,
+        }
+
+    @http.route('/it_asset/scan', type='json', auth='user')
+    def scan(self, code):
+        """Пошук активу за відсканованим кодом"""
+        code = (code or '').strip()
+        if not code:
+            return {'found': False}
+        Asset = request.env['it.asset'].with_context(active_test=False)
+        asset = Asset.search([('code', '=', code)], limit=1) \
+            or Asset.search([('serial_number', '=', code)], limit=1)
+        if not asset:
+            return {'found': False, 'code': code}
+        return dict(self._asset_values(asset), found=True)
+
+    @http.route('/it_asset/inventory/<int:inventory_id>/scan', type='json', auth='user')
+    def inventory_scan(self, inventory_id, codes, employee_id=False):
+        """Пакет сканів для сесії інвентаризації"""
+        inventory = request.env['it.asset.inventory'].browse(inventory_id).exists()
+        if not inventory:
+            return {'error': 'not_found'}
+        scans = inventory.add_scans(codes, employee_id=employee_id)
+        return {
+            'received': len(scans),
+            'unknown': [scan.scanned_code for scan in scans if not scan.asset_id],
+        }
@@ -1,4 +1,17 @@
+from . import ir_sequence
+from . import it_asset_perf
 from . import it_asset_category
 from . import it_asset
+from . import it_asset_label_report
+from . import it_asset_inventory
+from . import it_asset_import
+from . import it_asset_depreciation
 from . import it_asset_request
+from . import it_asset_request_sla
 from . import it_asset_movement
+from . import it_asset_custody
+from . import it_asset_allocation
+from . import it_asset_archive
+from . import it_asset_report
+from . import it_asset_transition
+from . import res_partner
@@ -0,0 +1,47 @@
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    """
+    Розширення ir.sequence для резервування номерів блоками.
+    Використовується при масовому створенні активів та переміщень.
+    """
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def next_block_by_code(self, sequence_code, count):
+        """Резервування суцільного блоку з count номерів за один запит"""
+        if count <= 0:
+            return []
+        company_id = self.env.company.id
+        sequence = self.sudo().search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [company_id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        #Послідовності з діапазонами дат обробляє стандартний механізм
+        if sequence.use_date_range:
+            return [sequence._next() for __ in range(count)]
+
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ('ir_sequence_%03d' % sequence.id, count)
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            #no_gap: блокуємо рядок послідовності і зсуваємо лічильник на весь блок
+            self.env.cr.execute(
+                "SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT",
+                (sequence.id,)
+            )
+            first = self.env.cr.fetchone()[0]
+            step = sequence.number_increment
+            self.env.cr.execute(
+                "UPDATE ir_sequence SET number_next = %s WHERE id = %s",
+                (first + step * count, sequence.id)
+            )
+            sequence.invalidate_recordset(['number_next'])
+            numbers = [first + step * i for i in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
@@ -1,5 +1,44 @@
+import base64
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import psycopg2
+from markupsafe import Markup
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools import sql, SQL, ormcache
+
+from .it_asset_perf import instrument
+
+_logger = logging.getLogger(__name__)
+
+#Розмір пакета для масового створення активів
+CREATE_BATCH_SIZE = 1000
+
+#З якої кількості активів зміна статусу логується пакетом, а не трекінгом
+BULK_TRACKING_THRESHOLD = 50
+
+#Поля активу, від яких залежить список активів партнера у формі заявки на порталі
+PORTAL_OPTION_FIELDS = {'employee_id', 'state', 'active', 'code', 'name'}
+
+#Розмір пакета для сканування гарантій
+WARRANTY_BATCH_SIZE = 1000
+
+#Скільки днів до закінчення гарантії створювати нагадування (за замовчуванням)
+WARRANTY_HORIZON_DAYS = 30
+
+#Максимум активів у переліку зведеного листа менеджеру
+WARRANTY_DIGEST_LIMIT = 200
+
+#Поля повнотекстового пошуку (trigram GIN індекси)
+TEXT_SEARCH_FIELDS = ('name', 'serial_number', 'manufacturer', 'model', 'specifications')
+
+#Максимум результатів ранжованого пошуку
+TEXT_SEARCH_LIMIT = 80
 
 
 class ITAsset(models.Model):
@@ -11,10 +50,16 @@ class ITAsset(models.Model):
     _description = 'IT Asset'
     _inherit = ['mail.thread', 'mail.activity.mixin']
     _order = 'name'
+    _rec_names_search = ['name', 'code', 'serial_number']
+
+    _sql_constraints = [
+        ('code_unique', 'unique(code)', 'Інвентарний номер має бути унікальним!'),
+    ]
 
     name = fields.Char(
         string='Назва активу',
         required=True,
+        index='trigram',
         tracking=True
     )
     
@@ -31,6 +76,7 @@ class ITAsset(models.Model):
         'it.asset.category',
         string='Категорія',
         required=True,
+        index=True,
         tracking=True
     )
     
@@ -41,19 +87,23 @@ class ITAsset(models.Model):
     #Технічні характеристики
     serial_number = fields.Char(
         string='Серійний номер',
+        index='btree_not_null',
         tracking=True
     )
     
     manufacturer = fields.Char(
-        string='Виробник'
+        string='Виробник',
+        index='trigram'
     )
     
     model = fields.Char(
-        string='Модель'
+        string='Модель',
+        index='trigram'
     )
     
     specifications = fields.Text(
         string='Технічні характеристики',
+        index='trigram',
         help='Детальний опис технічних характеристик активу'
     )
     
@@ -68,8 +118,23 @@ class ITAsset(models.Model):
         tracking=True
     )
     
+    book_value = fields.Float(
+        string='Балансова вартість',
+        readonly=True,
+        copy=False,
+        help='Оновлюється щомісячним розрахунком амортизації'
+    )
+
     warranty_end_date = fields.Date(
-        string='Дата закінчення гарантії'
+        string='Дата закінчення гарантії',
+        index='btree_not_null'
+    )
+
+    warranty_notified_date = fields.Date(
+        string='Нагадування надіслано для дати',
+        readonly=True,
+        copy=False,
+        help='Дата закінчення гарантії, про яку вже створено нагадування'
     )
     
     #Життєвий цикл
@@ -101,6 +166,13 @@ class ITAsset(models.Model):
         'asset_id',
         string='Історія переміщень'
     )
+
+    #Інтервали володіння (для запитів "у кого був актив на дату")
+    custody_ids = fields.One2many(
+        'it.asset.custody',
+        'asset_id',
+        string='Історія володіння'
+    )
     
     #Заявки пов'язані з активом
     request_ids = fields.One2many(
@@ -120,6 +192,29 @@ class ITAsset(models.Model):
         compute='_compute_qr_code',
         store=True
     )
+
+    #Зображення для етикеток зберігаються як вкладення. Генеруються при першому
+    #використанні (форма, друк) і перегенеровуються тільки при зміні коду
+    label_code = fields.Char(
+        string='Код етикетки',
+        readonly=True,
+        copy=False,
+        help='Інвентарний номер, для якого згенеровані зображення етикетки'
+    )
+
+    qr_image = fields.Binary(
+        string='QR зображення',
+        attachment=True,
+        readonly=True,
+        copy=False
+    )
+
+    barcode_image = fields.Binary(
+        string='Штрихкод',
+        attachment=True,
+        readonly=True,
+        copy=False
+    )
     
     active = fields.Boolean(
         string='Активний',
@@ -130,19 +225,240 @@ class ITAsset(models.Model):
         string='Примітки'
     )
     
+    def init(self):
+        """Складені та часткові індекси під фільтри порталу і record rules"""
+        cr = self.env.cr
+        #Активні призначення співробітника (лічильники, форма нової заявки)
+        sql.create_index(
+            cr, 'it_asset_employee_state_index', self._table,
+            ['employee_id', 'state'],
+            where="employee_id IS NOT NULL AND state IN ('assigned', 'in_use')",
+        )
+        #Record rule employee_id = partner + сортування списку на порталі
+        sql.create_index(
+            cr, 'it_asset_employee_assignment_index', self._table,
+            ['employee_id', 'assignment_date DESC', 'id DESC'],
+            where='employee_id IS NOT NULL',
+        )
+        #Пошук за частиною серійного номера (точний пошук сканера йде по btree індексу поля)
+        if sql.has_trigram(cr):
+            sql.create_index(
+                cr, 'it_asset_serial_number_trgm_index', self._table,
+                ['serial_number gin_trgm_ops'], method='gin',
+            )
+
+    def _auto_init(self):
+        """Розширення pg_trgm створюється до того, як ORM створює trigram індекси полів"""
+        self._ensure_trigram()
+        return super(ITAsset, self)._auto_init()
+
+    def _ensure_trigram(self):
+        """
+        Розширення pg_trgm для GIN індексів повнотекстового пошуку.
+        Реєстр перевіряє наявність pg_trgm тільки при завантаженні, тому прапорець
+        оновлюється тут - інакше індекси полів з'явились би лише при наступному оновленні.
+        """
+        cr = self.env.cr
+        if not sql.has_trigram(cr):
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except psycopg2.Error:
+                _logger.warning("it.asset: не вдалося створити розширення pg_trgm, пошук працюватиме без trigram індексів")
+                return False
+        self.pool.has_trigram = True
+        return True
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Генерація інвентарних номерів одним блоком для всіх нових активів"""
+        pending = [vals for vals in vals_list if vals.get('code', _('New')) == _('New')]
+        if pending:
+            codes = self._allocate_codes(len(pending))
+            for vals, code in zip(pending, codes):
+                vals['code'] = code
+        assets = super(ITAsset, self).create(vals_list)
+
+        #Початкове призначення (імпорт, RPC) теж потрапляє в історію переміщень
+        assigned = assets.filtered('employee_id')
+        if assigned:
+            assigned.employee_id._bump_it_asset_version()
+            self.env['it.asset.movement'].with_context(
+                it_asset_movement_skip_apply=True,
+                tracking_disable=True,
+                mail_create_nolog=True,
+            ).create([{
+                'asset_id': asset.id,
+                'previous_employee_id': False,
+                'employee_id': asset.employee_id.id,
+                'movement_date': asset.assignment_date or fields.Date.context_today(self),
+                'movement_type': 'assignment',
+                'notes': _('Призначено співробітнику'),
+            } for asset in assigned])
+        return assets
+
+    def unlink(self):
+        """Видалення активів разом з інтервалами володіння; оновлює версію активів власників"""
+        holders = self.employee_id
+        #Інтервали володіння переживають тільки перенесення в архів, не видалення
+        self.env.cr.execute("DELETE FROM it_asset_custody WHERE asset_res_id = ANY(%s)", [self.ids])
+        result = super(ITAsset, self).unlink()
+        holders._bump_it_asset_version()
+        return result
+
+    @api.model
+    def _portal_request_options(self, partner):
+        """
+        Активи партнера для форми заявки на порталі: (id, код, назва).
+        Кеш ключується версією списку активів партнера, тому поки закріплені
+        активи не змінились, форма не звертається до it.asset.
+        """
+        return self._portal_request_options_cached(partner.id, partner.it_asset_version)
+
+    @api.model
+    @ormcache('partner_id', 'version')
+    def _portal_request_options_cached(self, partner_id, version):
+        """Кешований список активів партнера для версії version"""
+        assets = self.sudo().search_fetch([
+            ('employee_id', '=', partner_id),
+            ('state', 'in', ['assigned', 'in_use']),
+        ], ['code', 'name'])
+        return tuple((asset.id, asset.code, asset.name) for asset in assets)
+
+    @api.model
+    def _allocate_codes(self, count):
+        """Резервування суцільного блоку інвентарних номерів за один запит"""
+        codes = self.env['ir.sequence'].next_block_by_code('it.asset', count)
+        return [code or _('New') for code in codes]
+
+    def write(self, vals):
+        """
+        При зміні співробітника історія переміщень створюється одним пакетом.
+        Зміна закріплених активів оновлює версію списку активів партнера (кеш порталу).
+        """
+        holders = self.employee_id if PORTAL_OPTION_FIELDS.intersection(vals) else None
+        result = self._write_with_movements(vals)
+        if holders is not None:
+            (holders | self.employee_id)._bump_it_asset_version()
+        return result
+
+    def _write_with_movements(self, vals):
+        if 'employee_id' not in vals or self.env.context.get('it_asset_skip_movements'):
+            return super(ITAsset, self).write(vals)
+
+        #Попередні власники до запису
+        previous = {asset.id: asset.employee_id.id for asset in self}
+        result = super(ITAsset, self).write(vals)
+
+        employee_id = vals['employee_id']
+        #Дата призначення заднім числом стає датою переміщення
+        movement_date = fields.Date.to_date(vals.get('assignment_date')) or fields.Date.context_today(self)
+        if not employee_id:
+            #Зняття зі співробітника без переміщення закриває інтервал володіння
+            self.env['it.asset.custody']._close(
+                [asset_id for asset_id, previous_id in previous.items() if previous_id],
+                movement_date,
+            )
+        else:
+            vals_list = [{
+                'asset_id': asset_id,
+                'previous_employee_id': previous_id,
+                'employee_id': employee_id,
+                'movement_date': movement_date,
+                'movement_type': 'transfer' if previous_id else 'assignment',
+                'notes': _('Призначено співробітнику'),
+            } for asset_id, previous_id in previous.items() if previous_id != employee_id]
+            #Активи вже оновлені - переміщення тільки фіксують історію
+            self.env['it.asset.movement'].with_context(
+                it_asset_movement_skip_apply=True,
+                tracking_disable=True,
+                mail_create_nolog=True,
+            ).create(vals_list)
+        return result
+
     @api.model
-    def create(self, vals):
-        """Генерація автоматичного інвентарного номера при створенні"""
-        if vals.get('code', _('New')) == _('New'):
-            vals['code'] = self.env['ir.sequence'].next_by_code('it.asset') or _('New')
-        return super(ITAsset, self).create(vals)
+    def create_batch(self, vals_list, batch_size=CREATE_BATCH_SIZE):
+        """
+        Масове створення активів (імпорт закупівель).
+        Записи вставляються пакетами без трекінгу в chatter,
+        кеш очищується після кожного пакета, щоб пам'ять не росла.
+        """
+        Asset = self.with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+            mail_notrack=True,
+        )
+        started = time.monotonic()
+        asset_ids = []
+        for start in range(0, len(vals_list), batch_size):
+            assets = Asset.create(vals_list[start:start + batch_size])
+            asset_ids.extend(assets.ids)
+            self.env.flush_all()
+            self.env.invalidate_all()
+
+        elapsed = time.monotonic() - started
+        _logger.info(
+            "it.asset: створено %d активів за %.2f с (%.0f активів/с)",
+            len(asset_ids), elapsed, len(asset_ids) / elapsed if elapsed else 0.0
+        )
+        return self.browse(asset_ids)
     
+    @api.model
+    def _text_search_domain(self, text, field_names=TEXT_SEARCH_FIELDS):
+        """Домен пошуку за частиною назви, серійного номера, виробника, моделі або характеристик"""
+        return expression.OR([[(field_name, 'ilike', text)] for field_name in field_names])
+
+    @api.model
+    def _search_ranked(self, text, domain=None, limit=TEXT_SEARCH_LIMIT, field_names=TEXT_SEARCH_FIELDS):
+        """
+        Повнотекстовий пошук з ранжуванням за trigram схожістю.
+        Фільтрація (з record rules) йде через GIN індекси полів field_names,
+        сортування - за найкращим word_similarity серед цих полів.
+        """
+        text = (text or '').strip()
+        if not text:
+            return self.browse()
+        self.check_access_rights('read')
+        domain = expression.AND([domain or [], self._text_search_domain(text, field_names)])
+        if not sql.has_trigram(self.env.cr):
+            return self.search(domain, limit=limit)
+
+        query = self._search(domain)
+        rank = SQL('GREATEST(%s)', SQL(', ').join(
+            SQL("word_similarity(%s, COALESCE(%s, ''))", text, SQL.identifier(field_name))
+            for field_name in field_names
+        ))
+        self.env.cr.execute(SQL(
+            "SELECT id FROM it_asset WHERE id IN (%s) ORDER BY %s DESC, id DESC LIMIT %s",
+            query.select(), rank, limit,
+        ))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
     @api.depends('code')
     def _compute_qr_code(self):
         """Генерація QR коду на основі інвентарного номера"""
         for asset in self:
             asset.qr_code = asset.code if asset.code != _('New') else ''
     
+    def _ensure_label_images(self):
+        """Генерація PNG QR коду та штрихкоду Code128 для активів без актуальних зображень"""
+        Report = self.env['ir.actions.report']
+        for asset in self.filtered(lambda a: a.qr_code and a.label_code != a.qr_code):
+            asset.sudo().with_context(tracking_disable=True).write({
+                'label_code': asset.qr_code,
+                'qr_image': base64.b64encode(Report.barcode('QR', asset.qr_code, width=300, height=300)),
+                'barcode_image': base64.b64encode(
+                    Report.barcode('Code128', asset.qr_code, width=600, height=120, humanreadable=1)
+                ),
+            })
+
+    def web_read(self, specification):
+        """Зображення етикетки генеруються при першому відкритті форми"""
+        if 'qr_image' in specification or 'barcode_image' in specification:
+            self._ensure_label_images()
+        return super(ITAsset, self).web_read(specification)
+
     def _compute_request_count(self):
         """Підрахунок кількості заявок для активу"""
         for asset in self:
@@ -172,6 +488,7 @@ class ITAsset(models.Model):
             'context': {'default_asset_id': self.id},
         }
     
+    @instrument
     def action_set_in_use(self):
         """Зміна статусу активу на 'У використанні'"""
         for asset in self:
@@ -179,25 +496,141 @@ class ITAsset(models.Model):
                 raise ValidationError(_('Не можна встановити статус "У використанні" без призначеного співробітника.'))
             asset.state = 'in_use'
     
+    @instrument
     def action_set_maintenance(self):
         """Зміна статусу активу на 'На ремонті'"""
-        self.write({'state': 'maintenance'})
+        self._write_transition({'state': 'maintenance'}, _('Відправлено на ремонт'))
     
+    @instrument
     def action_set_available(self):
         """Зміна статусу активу на 'Доступний'"""
-        self.write({'state': 'available', 'employee_id': False})
+        self._write_transition({'state': 'available', 'employee_id': False}, _('Повернено на склад'))
     
+    @instrument
     def action_retire(self):
         """Списання активу"""
-        self.write({'state': 'retired', 'active': False})
-    
-    @api.onchange('employee_id')
-    def _onchange_employee_id(self):
-        """Створення запису в історії переміщень при зміні співробітника"""
-        if self.employee_id and self.id:
-            self.env['it.asset.movement'].create({
-                'asset_id': self.id,
-                'employee_id': self.employee_id.id,
-                'movement_date': fields.Date.today(),
-                'notes': 'Призначено співробітнику'
-            })
+        self._write_transition({'state': 'retired', 'active': False}, _('Списання'))
+
+    def _write_transition(self, vals, name):
+        """
+        Зміна статусу з трекінгом для кількох активів або пакетно для великих наборів
+        (один підсумок на пакет, значення по кожному активу - в it.asset.transition.line).
+        """
+        if len(self) < BULK_TRACKING_THRESHOLD and not self.env.context.get('it_asset_bulk_transition'):
+            return self.write(vals)
+        return self.env['it.asset.transition']._apply(self, vals, name)
+    
+    def holder_at(self, day):
+        """Співробітник, за яким був закріплений кожен актив на дату: {asset_id: res.partner}"""
+        Partner = self.env['res.partner']
+        holders = {
+            asset_id: employee_id
+            for asset_id, employee_id, __, __ in self.env['it.asset.custody']._held_at(day, asset_ids=self.ids)
+        }
+        return {asset.id: Partner.browse(holders.get(asset.id)) for asset in self}
+
+    @api.model
+    def search_held_by(self, partner, day):
+        """
+        Активи (включно зі списаними), що були закріплені за співробітником на дату.
+        Активи, перенесені в архів, повертає it.asset.archive.search_held_by.
+        """
+        asset_ids = [row[0] for row in self.env['it.asset.custody']._held_at(day, partner_ids=partner.ids)]
+        return self.with_context(active_test=False).search([('id', 'in', asset_ids)], order='code')
+
+    def move_to_employee(self, employee, movement_type=None, reason=False, movement_date=None):
+        """
+        Масове переміщення активів до співробітника (звільнення, переїзд відділу).
+        Створює всі переміщення одним викликом create; активи, які вже
+        закріплені за цим співробітником, пропускаються.
+        """
+        assets = self.filtered(lambda asset: asset.employee_id != employee)
+        movement_date = movement_date or fields.Date.context_today(self)
+        vals_list = [{
+            'asset_id': asset.id,
+            'previous_employee_id': asset.employee_id.id,
+            'employee_id': employee.id,
+            'movement_date': movement_date,
+            'movement_type': movement_type or ('transfer' if asset.employee_id else 'assignment'),
+            'reason': reason,
+        } for asset in assets]
+        return self.env['it.asset.movement'].with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+        ).create(vals_list)
+
+    @api.model
+    def _cron_warranty_expiry(self):
+        """
+        Нагадування про закінчення гарантії в межах горизонту (параметр
+        it_asset_management.warranty_horizon_days). Активи читаються пакетами
+        по індексу warranty_end_date, активності створюються пакетно, а дата
+        гарантії, про яку вже нагадали, зберігається в активі, тому повторний
+        запуск не створює дублікатів. Зведений лист менеджерам надсилається в тому
+        ж пакеті (і тому ж commit), що й позначка про нагадування, тому збій між
+        пакетами не губить ні активності, ні листи.
+        """
+        horizon = int(self.env['ir.config_parameter'].sudo().get_param(
+            'it_asset_management.warranty_horizon_days', WARRANTY_HORIZON_DAYS
+        ))
+        today = fields.Date.context_today(self)
+        activity_type = self.env.ref('it_asset_management.mail_activity_warranty_expiry')
+        model_id = self.env['ir.model']._get_id('it.asset')
+        default_user = self.env.ref('base.user_admin')
+        Activity = self.env['mail.activity'].with_context(mail_activity_quick_update=True)
+
+        last_id = 0
+        while True:
+            assets = self.search_fetch([
+                ('warranty_end_date', '>=', today),
+                ('warranty_end_date', '<=', today + timedelta(days=horizon)),
+                ('state', '!=', 'retired'),
+                ('id', '>', last_id),
+            ], ['code', 'name', 'warranty_end_date', 'warranty_notified_date', 'category_id'],
+                order='id', limit=WARRANTY_BATCH_SIZE)
+            if not assets:
+                break
+            last_id = assets[-1].id
+
+            #Пропускаємо активи, про цю дату гарантії яких вже нагадали
+            assets = assets.filtered(lambda asset: asset.warranty_notified_date != asset.warranty_end_date)
+            if not assets:
+                continue
+            vals_list = []
+            digest = defaultdict(list)
+            for asset in assets:
+                user = asset.category_id.responsible_id or default_user
+                vals_list.append({
+                    'res_model_id': model_id,
+                    'res_id': asset.id,
+                    'activity_type_id': activity_type.id,
+                    'date_deadline': asset.warranty_end_date,
+                    'summary': _('Закінчується гарантія %s') % asset.code,
+                    'user_id': user.id,
+                })
+                digest[user.id].append((asset.code, asset.name, asset.warranty_end_date))
+            Activity.create(vals_list)
+            self.env.cr.execute(
+                "UPDATE it_asset SET warranty_notified_date = warranty_end_date WHERE id IN %s",
+                (tuple(assets.ids),)
+            )
+            self._send_warranty_digest(digest, horizon)
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+    @api.model
+    def _send_warranty_digest(self, digest, horizon):
+        """Зведений лист кожному менеджеру: {user_id: [(код, назва, дата гарантії)]}"""
+        for user in self.env['res.users'].browse(list(digest)):
+            items = digest[user.id]
+            lines = Markup('').join(
+                Markup('<li>%s - %s (%s)</li>') % (code, name, end_date)
+                for code, name, end_date in items[:WARRANTY_DIGEST_LIMIT]
+            )
+            self.env['mail.thread'].sudo().message_notify(
+                partner_ids=user.partner_id.ids,
+                subject=_('Закінчення гарантії: %s активів') % len(items),
+                body=Markup('<p>%s</p><ul>%s</ul>') % (
+                    _('Гарантія закінчується протягом %s днів:') % horizon, lines
+                ),
+            )
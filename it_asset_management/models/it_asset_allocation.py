@@ -0,0 +1,271 @@
+from collections import Counter, defaultdict, deque
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class ITAssetAllocation(models.Model):
+    """
+    Пакетний розподіл вільних активів за схваленими заявками на новий актив.
+    Заявки беруться в порядку пріоритету і дати, кожна отримує найстаріший
+    вільний актив своєї категорії або підкатегорії. Підбір виконується за
+    один прохід у пам'яті, переміщення створюються одним create, заявки
+    завершуються одним UPDATE, а нестача фіксується по категоріях.
+    """
+    _name = 'it.asset.allocation'
+    _description = 'IT Asset Allocation Run'
+    _inherit = ['mail.thread']
+    _order = 'date desc, id desc'
+
+    name = fields.Char(
+        string='Назва',
+        required=True,
+        default=lambda self: _('Розподіл %s') % fields.Date.context_today(self)
+    )
+
+    date = fields.Date(
+        string='Дата',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    state = fields.Selection([
+        ('draft', 'Чернетка'),
+        ('done', 'Виконано')
+    ], string='Статус', default='draft', required=True, tracking=True)
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Відповідальний',
+        default=lambda self: self.env.user
+    )
+
+    category_id = fields.Many2one(
+        'it.asset.category',
+        string='Категорія',
+        help='Розподіляти тільки заявки цієї категорії та всіх підкатегорій'
+    )
+
+    line_ids = fields.One2many(
+        'it.asset.allocation.line',
+        'allocation_id',
+        string='Видані активи'
+    )
+
+    shortage_ids = fields.One2many(
+        'it.asset.allocation.shortage',
+        'allocation_id',
+        string='Попит по категоріях'
+    )
+
+    request_count = fields.Integer(
+        string='Заявок',
+        readonly=True
+    )
+
+    allocated_count = fields.Integer(
+        string='Видано',
+        readonly=True
+    )
+
+    unmet_count = fields.Integer(
+        string='Не вистачило',
+        readonly=True
+    )
+
+    def action_run(self):
+        """Підбір активів і виконання заявок"""
+        self.ensure_one()
+        if self.state == 'done':
+            raise UserError(_('Розподіл вже виконано.'))
+
+        domain = [('state', '=', 'approved'), ('request_type', '=', 'new')]
+        if self.category_id:
+            domain.append(('category_id', 'child_of', self.category_id.id))
+        requests = self.env['it.asset.request'].search_fetch(
+            domain, ['category_id', 'requester_id'], order='priority desc, request_date, id'
+        )
+        matches, demand, allocated = self._match(requests)
+
+        if matches:
+            self._apply(matches)
+        self.shortage_ids = [(0, 0, {
+            'category_id': category_id,
+            'demand_count': count,
+            'allocated_count': allocated[category_id],
+        }) for category_id, count in demand.items()]
+        self.write({
+            'state': 'done',
+            'request_count': len(requests),
+            'allocated_count': len(matches),
+            'unmet_count': len(requests) - len(matches),
+        })
+        self.message_post(body=_('Видано %(allocated)s активів за %(requests)s заявками, не вистачило: %(unmet)s') % {
+            'allocated': self.allocated_count,
+            'requests': self.request_count,
+            'unmet': self.unmet_count,
+        })
+        return True
+
+    def _match(self, requests):
+        """
+        Підбір за один прохід. Кожен вільний актив потрапляє в черги всіх
+        запитаних категорій-предків (за parent_path), черги впорядковані від
+        найстарішого придбання; виданий актив пропускається в інших чергах.
+        Повертає пари (заявка, актив), попит і видачу по категоріях.
+        """
+        requested = set(requests.category_id.ids)
+        pools = defaultdict(deque)
+        if requested:
+            assets = self.env['it.asset'].search_fetch([
+                ('state', '=', 'available'),
+                ('employee_id', '=', False),
+                ('category_id', 'child_of', list(requested)),
+            ], ['category_id'], order='purchase_date, id')
+            for asset in assets:
+                for ancestor_id in map(int, asset.category_id.parent_path.split('/')[:-1]):
+                    if ancestor_id in requested:
+                        pools[ancestor_id].append(asset.id)
+
+        taken = set()
+        matches = []
+        demand, allocated = Counter(), Counter()
+        for request in requests:
+            category_id = request.category_id.id
+            demand[category_id] += 1
+            pool = pools.get(category_id)
+            while pool and pool[0] in taken:
+                pool.popleft()
+            if not pool:
+                continue
+            asset_id = pool.popleft()
+            taken.add(asset_id)
+            matches.append((request, asset_id))
+            allocated[category_id] += 1
+        return matches, demand, allocated
+
+    def _apply(self, matches):
+        """Переміщення, статус активів і завершення заявок пакетно"""
+        today = fields.Date.context_today(self)
+        Asset = self.env['it.asset']
+        Request = self.env['it.asset.request']
+        assets = Asset.browse([asset_id for __, asset_id in matches])
+        requests = Request.browse([request.id for request, __ in matches])
+
+        self.env['it.asset.movement'].with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+        ).create([{
+            'asset_id': asset_id,
+            'previous_employee_id': False,
+            'employee_id': request.requester_id.id,
+            'movement_date': today,
+            'movement_type': 'assignment',
+            'reason': _('%(run)s, заявка %(request)s') % {'run': self.name, 'request': request.name},
+        } for request, asset_id in matches])
+        assets.with_context(it_asset_bulk_transition=True)._write_transition({'state': 'assigned'}, self.name)
+
+        #Кожна заявка отримує свій актив - один UPDATE з масивів замість N write
+        Request.flush_model()
+        self.env.cr.execute("""
+            UPDATE it_asset_request req
+               SET asset_id = data.asset_id,
+                   state = 'done',
+                   completion_date = %s,
+                   write_uid = %s,
+                   write_date = now() at time zone 'UTC'
+              FROM unnest(%s::int[], %s::int[]) AS data(id, asset_id)
+             WHERE req.id = data.id
+        """, (today, self.env.uid, requests.ids, assets.ids))
+        Request.invalidate_model(['asset_id', 'state', 'completion_date', 'write_uid', 'write_date'])
+        Asset.invalidate_model(['request_ids', 'request_count'])
+        Request._refresh_sla(requests.ids)
+
+        codes = dict(zip(assets.ids, assets.mapped('code')))
+        requests._message_log_batch({
+            request.id: _('Видано актив %(code)s (%(run)s)') % {'code': codes[asset_id], 'run': self.name}
+            for request, asset_id in matches
+        })
+        self.line_ids = [(0, 0, {
+            'request_id': request.id,
+            'asset_id': asset_id,
+        }) for request, asset_id in matches]
+
+
+class ITAssetAllocationLine(models.Model):
+    """Актив, виданий за заявкою під час розподілу"""
+    _name = 'it.asset.allocation.line'
+    _description = 'IT Asset Allocation Line'
+    _order = 'id'
+
+    allocation_id = fields.Many2one(
+        'it.asset.allocation',
+        string='Розподіл',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    request_id = fields.Many2one(
+        'it.asset.request',
+        string='Заявка',
+        required=True,
+        ondelete='cascade'
+    )
+
+    requester_id = fields.Many2one(
+        related='request_id.requester_id',
+        string='Заявник'
+    )
+
+    asset_id = fields.Many2one(
+        'it.asset',
+        string='Актив',
+        required=True,
+        ondelete='cascade'
+    )
+
+    category_id = fields.Many2one(
+        related='asset_id.category_id',
+        string='Категорія активу'
+    )
+
+
+class ITAssetAllocationShortage(models.Model):
+    """Попит і нестача по запитаній категорії за результатами розподілу"""
+    _name = 'it.asset.allocation.shortage'
+    _description = 'IT Asset Allocation Unmet Demand'
+    _order = 'unmet_count desc, id'
+
+    allocation_id = fields.Many2one(
+        'it.asset.allocation',
+        string='Розподіл',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+
+    category_id = fields.Many2one(
+        'it.asset.category',
+        string='Категорія',
+        help='Порожня - заявки без категорії'
+    )
+
+    demand_count = fields.Integer(
+        string='Заявок'
+    )
+
+    allocated_count = fields.Integer(
+        string='Видано'
+    )
+
+    unmet_count = fields.Integer(
+        string='Не вистачило',
+        compute='_compute_unmet_count',
+        store=True
+    )
+
+    @api.depends('demand_count', 'allocated_count')
+    def _compute_unmet_count(self):
+        for shortage in self:
+            shortage.unmet_count = shortage.demand_count - shortage.allocated_count
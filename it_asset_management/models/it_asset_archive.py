@@ -0,0 +1,407 @@
+import json
+import logging
+
+from psycopg2 import IntegrityError
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+#Списані активи, які не змінювались довше за стільки днів, переносяться в архів
+ARCHIVE_RETIRED_DAYS = 365
+#Переміщення старші за стільки років переносяться в архів (останнє переміщення активу лишається)
+ARCHIVE_MOVEMENT_YEARS = 3
+#Скільки записів переноситься за одну транзакцію cron
+ARCHIVE_BATCH_SIZE = 1000
+
+#Рядки, що видаляються разом з активом (ondelete cascade) - зберігаються в архіві повністю
+ARCHIVE_CASCADE_TABLES = (
+    'it_asset_depreciation',
+    'it_asset_transition_line',
+    'it_asset_inventory_line',
+    'it_asset_allocation_line',
+)
+#Рядки, де посилання на актив обнуляється - зберігаються тільки id для відновлення зв'язку
+ARCHIVE_RELINK_TABLES = (
+    'it_asset_request',
+    'it_asset_inventory_scan',
+)
+
+
+class ITAssetArchive(models.Model):
+    """
+    Холодний архів списаних активів.
+    Рядок активу і залежні записи зберігаються одним jsonb, а для пошуку
+    лишаються тільки кілька колонок, тому робочі таблиці it_asset і
+    it_asset_movement (та їх індекси) не ростуть зі списаними активами.
+    Chatter, вкладення та інтервали володіння активу не видаляються і знову
+    підхоплюються після відновлення, бо актив відновлюється з тим самим id.
+    """
+    _name = 'it.asset.archive'
+    _description = 'IT Asset Cold Archive'
+    _order = 'archived_date desc, id desc'
+    _rec_name = 'code'
+
+    res_id = fields.Integer(
+        string='ID активу',
+        required=True,
+        readonly=True,
+        index=True
+    )
+
+    code = fields.Char(
+        string='Інвентарний номер',
+        readonly=True,
+        index=True
+    )
+
+    name = fields.Char(
+        string='Назва',
+        readonly=True
+    )
+
+    serial_number = fields.Char(
+        string='Серійний номер',
+        readonly=True,
+        index='btree_not_null'
+    )
+
+    category_id = fields.Many2one(
+        'it.asset.category',
+        string='Категорія',
+        readonly=True,
+        ondelete='set null'
+    )
+
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Останній співробітник',
+        readonly=True,
+        ondelete='set null'
+    )
+
+    purchase_date = fields.Date(
+        string='Дата придбання',
+        readonly=True
+    )
+
+    retired_date = fields.Date(
+        string='Списано',
+        readonly=True,
+        help='Дата останньої зміни активу перед архівацією'
+    )
+
+    archived_date = fields.Datetime(
+        string='Перенесено в архів',
+        readonly=True
+    )
+
+    movement_count = fields.Integer(
+        string='Переміщень',
+        readonly=True
+    )
+
+    data = fields.Json(
+        string='Рядок активу',
+        readonly=True
+    )
+
+    related_data = fields.Json(
+        string='Залежні записи',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('res_id_unique', 'unique(res_id)', 'Актив вже є в архіві!'),
+    ]
+
+    @api.model
+    def _get_retention(self):
+        """Вікно зберігання (днів для активів, років для переміщень) з параметрів системи"""
+        params = self.env['ir.config_parameter'].sudo()
+        return (
+            int(params.get_param('it_asset_management.archive_retired_days', ARCHIVE_RETIRED_DAYS)),
+            int(params.get_param('it_asset_management.archive_movement_years', ARCHIVE_MOVEMENT_YEARS)),
+        )
+
+    @api.model
+    def _archive_assets(self, asset_ids):
+        """
+        Перенесення активів в архів: спочатку вся їх історія переміщень,
+        потім рядок активу з залежними записами, все через DELETE ... RETURNING.
+        Всі підзапити одного оператора бачать той самий знімок, тому залежні
+        записи читаються до каскадного видалення.
+        """
+        if not asset_ids:
+            return 0
+        self.env.flush_all()
+        cr = self.env.cr
+        self.env['it.asset.movement.archive']._move(
+            "SELECT id FROM it_asset_movement WHERE asset_id = ANY(%s)", [asset_ids]
+        )
+        cr.execute("SELECT DISTINCT employee_id FROM it_asset WHERE id = ANY(%s) AND employee_id IS NOT NULL",
+                   [asset_ids])
+        holder_ids = [row[0] for row in cr.fetchall()]
+
+        related = ', '.join(
+            "'%(table)s', (SELECT COALESCE(jsonb_agg(to_jsonb(t)), '[]') FROM %(table)s t WHERE t.asset_id = moved.id)"
+            % {'table': table} for table in ARCHIVE_CASCADE_TABLES
+        ) + ', ' + ', '.join(
+            "'%(table)s', (SELECT COALESCE(jsonb_agg(t.id), '[]') FROM %(table)s t WHERE t.asset_id = moved.id)"
+            % {'table': table} for table in ARCHIVE_RELINK_TABLES
+        )
+        cr.execute("""
+            WITH moved AS (
+                DELETE FROM it_asset WHERE id = ANY(%%s) RETURNING *
+            )
+            INSERT INTO it_asset_archive
+                   (res_id, code, name, serial_number, category_id, employee_id, purchase_date,
+                    retired_date, archived_date, movement_count, data, related_data,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT moved.id, moved.code, moved.name, moved.serial_number, moved.category_id,
+                   moved.employee_id, moved.purchase_date, moved.write_date::date,
+                   now() at time zone 'UTC',
+                   (SELECT count(*) FROM it_asset_movement_archive m WHERE m.asset_res_id = moved.id),
+                   to_jsonb(moved), jsonb_build_object(%s),
+                   %%s, now() at time zone 'UTC', %%s, now() at time zone 'UTC'
+              FROM moved
+        """ % related, [asset_ids, self.env.uid, self.env.uid])
+        archived = cr.rowcount
+
+        self.env['res.partner'].browse(holder_ids)._bump_it_asset_version()
+        self.env.invalidate_all()
+        return archived
+
+    @api.model
+    def search_held_by(self, partner, day):
+        """Активи в архіві, що були закріплені за співробітником на дату (за інтервалами володіння)"""
+        asset_ids = [row[0] for row in self.env['it.asset.custody']._held_at(day, partner_ids=partner.ids)]
+        return self.search([('res_id', 'in', asset_ids)], order='code')
+
+    def action_restore(self):
+        """
+        Відновлення активу з тим самим id разом з переміщеннями і залежними записами.
+        Актив лишається списаним і неактивним, як був до архівації.
+        """
+        self.check_access_rights('unlink')
+        self.env.flush_all()
+        cr = self.env.cr
+        for archive in self:
+            try:
+                with cr.savepoint():
+                    cr.execute("""
+                        INSERT INTO it_asset
+                        SELECT * FROM jsonb_populate_record(NULL::it_asset, %s::jsonb)
+                    """, [json.dumps(archive.data)])
+                    related = archive.related_data or {}
+                    for table in ARCHIVE_CASCADE_TABLES:
+                        if related.get(table):
+                            cr.execute("""
+                                INSERT INTO %s
+                                SELECT * FROM jsonb_populate_recordset(NULL::%s, %%s::jsonb)
+                            """ % (table, table), [json.dumps(related[table])])
+                    for table in ARCHIVE_RELINK_TABLES:
+                        if related.get(table):
+                            cr.execute("""
+                                UPDATE %s SET asset_id = %%s
+                                 WHERE id = ANY(%%s) AND asset_id IS NULL
+                            """ % table, [archive.res_id, related[table]])
+                    #Інтервали володіння лишались у робочій таблиці (за asset_res_id)
+                    cr.execute("UPDATE it_asset_custody SET asset_id = %s WHERE asset_res_id = %s",
+                               [archive.res_id, archive.res_id])
+                    self.env['it.asset.movement.archive'].search(
+                        [('asset_res_id', '=', archive.res_id)]
+                    )._restore_rows()
+            except IntegrityError:
+                raise UserError(_(
+                    'Актив %(code)s неможливо відновити: пов\'язані записи (категорія, співробітник, '
+                    'інвентаризація або пакет зміни статусу) вже видалені, або інвентарний номер зайнято.'
+                ) % {'code': archive.code})
+
+        self.env.invalidate_all()
+        self.env['res.partner'].browse(self.employee_id.ids)._bump_it_asset_version()
+        asset_ids = self.mapped('res_id')
+        self.unlink()
+        assets = self.env['it.asset'].with_context(active_test=False).browse(asset_ids)
+        assets._message_log_batch({asset.id: _('Актив відновлено з архіву') for asset in assets})
+        if len(assets) == 1:
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'it.asset',
+                'res_id': assets.id,
+                'view_mode': 'form',
+            }
+        return True
+
+    @api.model
+    def _cron_archive(self):
+        """
+        Перенесення в архів списаних активів поза вікном зберігання і старих переміщень.
+        Кожна частина фіксується окремим commit, щоб не тримати довгу транзакцію.
+        """
+        retired_days, movement_years = self._get_retention()
+        cr = self.env.cr
+        assets_total = movements_total = 0
+        while True:
+            #Активи з відкритими заявками лишаються в робочій таблиці
+            cr.execute("""
+                SELECT asset.id
+                  FROM it_asset asset
+                 WHERE asset.state = 'retired'
+                   AND NOT asset.active
+                   AND asset.write_date < now() at time zone 'UTC' - make_interval(days => %s)
+                   AND NOT EXISTS (
+                        SELECT 1 FROM it_asset_request req
+                         WHERE req.asset_id = asset.id
+                           AND req.state NOT IN ('done', 'rejected', 'cancelled')
+                   )
+              ORDER BY asset.id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [retired_days, ARCHIVE_BATCH_SIZE])
+            asset_ids = [row[0] for row in cr.fetchall()]
+            if not asset_ids:
+                break
+            assets_total += self._archive_assets(asset_ids)
+            self.env.cr.commit()
+
+        Movement = self.env['it.asset.movement.archive']
+        while True:
+            moved = Movement._move("""
+                SELECT m.id
+                  FROM it_asset_movement m
+                 WHERE m.movement_date < (now() at time zone 'UTC')::date - make_interval(years => %s)
+                   AND EXISTS (
+                        SELECT 1 FROM it_asset_movement newer
+                         WHERE newer.asset_id = m.asset_id
+                           AND (newer.movement_date, newer.id) > (m.movement_date, m.id)
+                   )
+                 LIMIT %s
+            """, [movement_years, ARCHIVE_BATCH_SIZE])
+            if not moved:
+                break
+            movements_total += moved
+            self.env.invalidate_all()
+            self.env.cr.commit()
+        _logger.info("it.asset: в архів перенесено %d активів і %d переміщень", assets_total, movements_total)
+
+
+class ITAssetMovementArchive(models.Model):
+    """
+    Холодний архів переміщень: старі переміщення всіх активів
+    і повна історія активів, перенесених в архів.
+    """
+    _name = 'it.asset.movement.archive'
+    _description = 'IT Asset Movement Cold Archive'
+    _order = 'movement_date desc, id desc'
+
+    res_id = fields.Integer(
+        string='ID переміщення',
+        required=True,
+        readonly=True
+    )
+
+    name = fields.Char(
+        string='Номер переміщення',
+        readonly=True
+    )
+
+    asset_res_id = fields.Integer(
+        string='ID активу',
+        readonly=True,
+        index=True
+    )
+
+    asset_code = fields.Char(
+        string='Інвентарний номер',
+        readonly=True,
+        index=True
+    )
+
+    previous_employee_id = fields.Many2one(
+        'res.partner',
+        string='Попередній співробітник',
+        readonly=True,
+        ondelete='set null'
+    )
+
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Співробітник',
+        readonly=True,
+        ondelete='set null',
+        index=True
+    )
+
+    movement_date = fields.Date(
+        string='Дата переміщення',
+        readonly=True
+    )
+
+    movement_type = fields.Selection(
+        selection=lambda self: self.env['it.asset.movement']._fields['movement_type'].selection,
+        string='Тип переміщення',
+        readonly=True
+    )
+
+    archived_date = fields.Datetime(
+        string='Перенесено в архів',
+        readonly=True
+    )
+
+    data = fields.Json(
+        string='Рядок переміщення',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('res_id_unique', 'unique(res_id)', 'Переміщення вже є в архіві!'),
+    ]
+
+    @api.model
+    def _move(self, select_query, params):
+        """Перенесення переміщень, id яких повертає select_query, одним DELETE ... RETURNING"""
+        self.env.cr.execute("""
+            WITH moved AS (
+                DELETE FROM it_asset_movement WHERE id IN (%s) RETURNING *
+            )
+            INSERT INTO it_asset_movement_archive
+                   (res_id, name, asset_res_id, asset_code, previous_employee_id, employee_id,
+                    movement_date, movement_type, archived_date, data,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT id, name, asset_id, asset_code, previous_employee_id, employee_id,
+                   movement_date, movement_type, now() at time zone 'UTC', to_jsonb(moved),
+                   %%s, now() at time zone 'UTC', %%s, now() at time zone 'UTC'
+              FROM moved
+        """ % select_query, list(params) + [self.env.uid, self.env.uid])
+        return self.env.cr.rowcount
+
+    def _restore_rows(self):
+        """Повернення переміщень у робочу таблицю з тими самими id"""
+        if not self:
+            return
+        self.env.cr.execute("""
+            INSERT INTO it_asset_movement
+            SELECT (jsonb_populate_record(NULL::it_asset_movement, data)).*
+              FROM it_asset_movement_archive
+             WHERE id = ANY(%s)
+        """, [self.ids])
+        self.env.cr.execute("DELETE FROM it_asset_movement_archive WHERE id = ANY(%s)", [self.ids])
+        self.invalidate_model()
+
+    def action_restore(self):
+        """Відновлення переміщень активів, які ще є в робочій таблиці"""
+        self.check_access_rights('unlink')
+        self.env.flush_all()
+        self.env.cr.execute("SELECT id FROM it_asset WHERE id = ANY(%s)", [list(set(self.mapped('asset_res_id')))])
+        live = {row[0] for row in self.env.cr.fetchall()}
+        orphans = self.filtered(lambda movement: movement.asset_res_id not in live)
+        if orphans:
+            raise UserError(_(
+                'Актив %s в архіві - відновіть актив, його переміщення повернуться разом з ним.'
+            ) % ', '.join(set(orphans.mapped('asset_code'))))
+        self._restore_rows()
+        self.env['it.asset.movement'].invalidate_model()
+        self.env['it.asset'].invalidate_model(['movement_ids'])
+        return True
@@ -1,4 +1,8 @@
 from odoo import models, fields, api
+from odoo.tools import sql, ormcache
+
+#Поля категорії, від яких залежить список категорій у формі заявки на порталі
+PORTAL_OPTION_FIELDS = {'name', 'parent_id', 'active'}
 
 
 class ITAssetCategory(models.Model):
@@ -10,7 +14,10 @@ class ITAssetCategory(models.Model):
     #Внутрішні атрибути моделі
     _name = 'it.asset.category'
     _description = 'IT Asset Category'
-    _order = 'name'
+    _parent_name = 'parent_id'
+    _parent_store = True
+    _rec_name = 'complete_name'
+    _order = 'complete_name'
 
     #Базова інформація про категорію
     name = fields.Char(
@@ -28,6 +35,32 @@ class ITAssetCategory(models.Model):
         string='Опис'
     )
 
+    #Амортизація
+    depreciation_method = fields.Selection([
+        ('none', 'Без амортизації'),
+        ('linear', 'Лінійний'),
+        ('degressive', 'Зменшуваного залишку')
+    ], string='Метод амортизації', default='none', required=True)
+
+    depreciation_months = fields.Integer(
+        string='Строк використання (міс.)',
+        default=36
+    )
+
+    declining_rate = fields.Float(
+        string='Коефіцієнт прискорення',
+        default=2.0,
+        help='Для методу зменшуваного залишку: місячна норма = коефіцієнт / строк'
+    )
+
+    #Хто отримує нагадування про закінчення гарантії
+    responsible_id = fields.Many2one(
+        'res.users',
+        string='Відповідальний менеджер',
+        domain=[('share', '=', False)],
+        help='Отримує нагадування про закінчення гарантії активів цієї категорії'
+    )
+
     #Ієрархічна структура (дерево категорій)
     parent_id = fields.Many2one(
         'it.asset.category',
@@ -41,32 +74,125 @@ class ITAssetCategory(models.Model):
         string='Дочірні категорії'
     )
 
+    #Матеріалізований шлях (1/5/12/) для швидких child_of запитів
+    parent_path = fields.Char(
+        index=True,
+        unaccent=False
+    )
+
+    complete_name = fields.Char(
+        string='Повна назва',
+        compute='_compute_complete_name',
+        recursive=True,
+        store=True,
+        index=True
+    )
+
     #Computed поле - автоматичний підрахунок
     asset_count = fields.Integer(
         string='Кількість активів',
         compute='_compute_asset_count'
     )
 
+    #Агрегати з урахуванням підкатегорій
+    asset_count_total = fields.Integer(
+        string='Активів з підкатегоріями',
+        compute='_compute_asset_totals'
+    )
+
+    purchase_value_total = fields.Float(
+        string='Вартість з підкатегоріями',
+        compute='_compute_asset_totals',
+        help='Сумарна ціна придбання активів категорії та всіх її підкатегорій'
+    )
+
     #Стандартне поле для архівації
     active = fields.Boolean(
         string='Активна',
         default=True
     )
     
-    @api.depends('name')
+    def init(self):
+        """Індекс для префіксних LIKE запитів по parent_path незалежно від collation"""
+        sql.create_index(
+            self.env.cr,
+            'it_asset_category_parent_path_pattern_index',
+            self._table,
+            ['parent_path text_pattern_ops'],
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Нові категорії скидають кеш опцій порталу"""
+        categories = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return categories
+
+    def write(self, vals):
+        """Скидання кешу опцій порталу тільки при зміні полів, що в них входять"""
+        result = super().write(vals)
+        #Кеш опцій порталу залежить тільки від назви, ієрархії і активності
+        if PORTAL_OPTION_FIELDS.intersection(vals):
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        """Видалені категорії скидають кеш опцій порталу"""
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @ormcache()
+    def _portal_options(self):
+        """
+        Категорії для форми заявки на порталі: (id, повний шлях).
+        Кеш спільний для всіх користувачів і скидається при створенні, видаленні
+        або зміні назви, батьківської категорії чи активності категорії.
+        """
+        categories = self.sudo().search_fetch([], ['complete_name'], order='complete_name')
+        return tuple((category.id, category.complete_name) for category in categories)
+
+    @api.depends('name', 'parent_id.complete_name')
+    def _compute_complete_name(self):
+        """Повний шлях категорії з урахуванням ієрархії"""
+        for category in self:
+            if category.parent_id:
+                category.complete_name = f"{category.parent_id.complete_name} / {category.name}"
+            else:
+                category.complete_name = category.name
+
     def _compute_asset_count(self):
-        """Підрахування кількості активів в кожній категорії"""
+        """Підрахування кількості активів для всіх категорій одним GROUP BY"""
+        counts = {
+            category.id: count
+            for category, count in self.env['it.asset']._read_group(
+                [('category_id', 'in', self._origin.ids)],
+                ['category_id'],
+                ['__count'],
+            )
+        }
         for category in self:
-            category.asset_count = self.env['it.asset'].search_count([
-                ('category_id', '=', category.id)
-            ])
-    
-    def name_get(self):
-        """Форматування відображення назви категорії з урахуванням ієрархії"""
-        result = []
+            category.asset_count = counts.get(category._origin.id, 0)
+
+    def _compute_asset_totals(self):
+        """Кількість і вартість активів по всьому піддереву одним запитом по parent_path"""
+        totals = {}
+        if self._origin.ids:
+            self.env['it.asset'].flush_model(['category_id', 'purchase_price', 'active'])
+            self.flush_model(['parent_path'])
+            self.env.cr.execute("""
+                SELECT root.id, COUNT(asset.id), COALESCE(SUM(asset.purchase_price), 0)
+                  FROM it_asset_category root
+                  JOIN it_asset_category child
+                         ON child.parent_path LIKE root.parent_path || '%%'
+                  LEFT JOIN it_asset asset
+                         ON asset.category_id = child.id AND asset.active
+                 WHERE root.id IN %s
+                 GROUP BY root.id
+            """, (tuple(self._origin.ids),))
+            totals = {root_id: (count, value) for root_id, count, value in self.env.cr.fetchall()}
         for category in self:
-            name = category.name
-            if category.parent_id:
-                name = f"{category.parent_id.name} / {name}"
-            result.append((category.id, name))
-        return result
+            count, value = totals.get(category._origin.id, (0, 0.0))
+            category.asset_count_total = count
+            category.purchase_value_total = value
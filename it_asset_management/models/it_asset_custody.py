@@ -0,0 +1,182 @@
+from odoo import models, fields, api
+from odoo.tools import sql, SQL
+
+
+class ITAssetCustody(models.Model):
+    """
+    Інтервал володіння активом: співробітник тримав актив з valid_from
+    (включно) до valid_to (не включно, порожня - тримає зараз).
+    Інтервали підтримуються при створенні переміщень і індексуються GiST
+    індексом по daterange, тому запит "у кого був актив на дату" не
+    перебирає історію переміщень. Інтервали лишаються і після перенесення
+    старих переміщень в архів, і після перенесення списаного активу в архів
+    (asset_id обнуляється, asset_res_id зберігає id активу).
+    """
+    _name = 'it.asset.custody'
+    _description = 'IT Asset Custody Interval'
+    _order = 'valid_from desc, id desc'
+    _rec_name = 'asset_id'
+    _log_access = False
+
+    asset_id = fields.Many2one(
+        'it.asset',
+        string='Актив',
+        ondelete='set null',
+        help='Порожнє, якщо актив перенесено в архів'
+    )
+
+    #Id активу, який зберігається і для активів в архіві (всі запити інтервалів йдуть по ньому)
+    asset_res_id = fields.Integer(
+        string='ID активу',
+        required=True,
+        index=True
+    )
+
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Співробітник',
+        required=True,
+        index=True
+    )
+
+    movement_id = fields.Many2one(
+        'it.asset.movement',
+        string='Переміщення',
+        ondelete='set null',
+        help='Переміщення, яким почався інтервал (порожнє, якщо перенесене в архів)'
+    )
+
+    valid_from = fields.Date(
+        string='З',
+        required=True
+    )
+
+    valid_to = fields.Date(
+        string='До',
+        help='Перший день, коли актив вже не у співробітника. Порожня - актив досі у співробітника'
+    )
+
+    date_on = fields.Date(
+        string='На дату',
+        compute='_compute_date_on',
+        search='_search_date_on'
+    )
+
+    def init(self):
+        """GiST індекс інтервалів і початкове заповнення з історії переміщень"""
+        sql.create_index(
+            self.env.cr, 'it_asset_custody_period_index', self._table,
+            ["daterange(valid_from, valid_to, '[)')"], method='gist',
+        )
+        self.env.cr.execute("SELECT 1 FROM it_asset_custody LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    def _compute_date_on(self):
+        self.date_on = False
+
+    def _search_date_on(self, operator, value):
+        if operator != '=' or not value:
+            return []
+        return ['&', ('valid_from', '<=', value), '|', ('valid_to', '=', False), ('valid_to', '>', value)]
+
+    @api.model
+    def _rebuild(self, asset_ids=None):
+        """
+        Побудова інтервалів з переміщень (встановлення модуля, згенеровані дані).
+        Для кожного активу інтервал триває до наступного переміщення,
+        переміщення в один день дають порожні інтервали і пропускаються.
+        """
+        where = SQL("TRUE") if asset_ids is None else SQL("m.asset_id = ANY(%s)", list(asset_ids))
+        if asset_ids is not None:
+            self.env.cr.execute("DELETE FROM it_asset_custody WHERE asset_res_id = ANY(%s)", [list(asset_ids)])
+        else:
+            self.env.cr.execute("DELETE FROM it_asset_custody")
+        self.env.cr.execute(SQL("""
+            INSERT INTO it_asset_custody (asset_id, asset_res_id, employee_id, movement_id, valid_from, valid_to)
+            SELECT asset_id, asset_id, employee_id, id, valid_from, valid_to
+              FROM (
+                    SELECT m.asset_id, m.employee_id, m.id, m.movement_date AS valid_from,
+                           lead(m.movement_date) OVER (PARTITION BY m.asset_id ORDER BY m.movement_date, m.id) AS valid_to
+                      FROM it_asset_movement m
+                     WHERE %s
+                   ) seq
+             WHERE valid_to IS NULL OR valid_to > valid_from
+        """, where))
+        self.invalidate_model()
+
+    @api.model
+    def _apply_movements(self, movements):
+        """
+        Оновлення інтервалів після створення переміщень. Для кожного активу
+        інтервали з дати найранішого нового переміщення будуються заново
+        (переміщення заднім числом теж враховуються), попередній інтервал
+        закривається цією датою. Три запити на весь пакет.
+        """
+        cutoffs = {}
+        for movement in movements:
+            asset_id = movement.asset_id.id
+            if asset_id not in cutoffs or movement.movement_date < cutoffs[asset_id]:
+                cutoffs[asset_id] = movement.movement_date
+        if not cutoffs:
+            return
+        cutoff = SQL("unnest(%s::int[], %s::date[]) AS cutoff(asset_id, day)", list(cutoffs), list(cutoffs.values()))
+        cr = self.env.cr
+        cr.execute(SQL("""
+            DELETE FROM it_asset_custody c
+             USING %s
+             WHERE c.asset_res_id = cutoff.asset_id
+               AND c.valid_from >= cutoff.day
+        """, cutoff))
+        cr.execute(SQL("""
+            UPDATE it_asset_custody c
+               SET valid_to = cutoff.day
+              FROM %s
+             WHERE c.asset_res_id = cutoff.asset_id
+               AND (c.valid_to IS NULL OR c.valid_to > cutoff.day)
+        """, cutoff))
+        cr.execute(SQL("""
+            INSERT INTO it_asset_custody (asset_id, asset_res_id, employee_id, movement_id, valid_from, valid_to)
+            SELECT asset_id, asset_id, employee_id, id, valid_from, valid_to
+              FROM (
+                    SELECT m.asset_id, m.employee_id, m.id, m.movement_date AS valid_from,
+                           lead(m.movement_date) OVER (PARTITION BY m.asset_id ORDER BY m.movement_date, m.id) AS valid_to
+                      FROM it_asset_movement m
+                      JOIN %s ON cutoff.asset_id = m.asset_id AND m.movement_date >= cutoff.day
+                   ) seq
+             WHERE valid_to IS NULL OR valid_to > valid_from
+        """, cutoff))
+        self.invalidate_model()
+
+    @api.model
+    def _close(self, asset_ids, day):
+        """Закриття відкритих інтервалів, коли актив знімають зі співробітника без переміщення"""
+        if not asset_ids:
+            return
+        self.env.cr.execute("""
+            DELETE FROM it_asset_custody
+             WHERE asset_res_id = ANY(%s) AND valid_to IS NULL AND valid_from >= %s
+        """, [list(asset_ids), day])
+        self.env.cr.execute("""
+            UPDATE it_asset_custody SET valid_to = %s
+             WHERE asset_res_id = ANY(%s) AND valid_to IS NULL
+        """, [day, list(asset_ids)])
+        self.invalidate_model()
+
+    @api.model
+    def _held_at(self, day, asset_ids=None, partner_ids=None):
+        """
+        Інтервали, що містять дату day: [(id активу, employee_id, valid_from, valid_to)],
+        включно з активами, перенесеними в архів. Умова @> на daterange йде по GiST індексу.
+        """
+        conditions = [SQL("daterange(valid_from, valid_to, '[)') @> %s::date", day)]
+        if asset_ids is not None:
+            conditions.append(SQL("asset_res_id = ANY(%s)", list(asset_ids)))
+        if partner_ids is not None:
+            conditions.append(SQL("employee_id = ANY(%s)", list(partner_ids)))
+        self.env.cr.execute(SQL("""
+            SELECT asset_res_id, employee_id, valid_from, valid_to
+              FROM it_asset_custody
+             WHERE %s
+        """, SQL(" AND ").join(conditions)))
+        return self.env.cr.fetchall()
@@ -0,0 +1,356 @@
+import base64
+import csv
+import io
+import logging
+import time
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+#Кількість рядків, що створюються і фіксуються (commit) за один раз
+IMPORT_CHUNK_SIZE = 1000
+
+#Обмеження часу одного запуску cron, після якого задача продовжиться з checkpoint
+IMPORT_TIME_LIMIT = 240
+
+IMPORT_COLUMNS = [
+    'name', 'category', 'code', 'serial_number', 'manufacturer', 'model',
+    'purchase_date', 'purchase_price', 'warranty_end_date', 'employee',
+    'state', 'specifications',
+]
+
+
+class ITAssetImport(models.Model):
+    """
+    Задача масового імпорту активів з CSV (придбання, поглинання компаній).
+    Рядки перевіряються наперед, посилання на категорії та співробітників
+    визначаються пакетними пошуками, а створення йде частинами з commit
+    і checkpoint, тому після збою імпорт продовжується з місця зупинки.
+    """
+    _name = 'it.asset.import'
+    _description = 'IT Asset Bulk Import'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Назва',
+        required=True,
+        default=lambda self: _('Імпорт активів')
+    )
+
+    file = fields.Binary(
+        string='CSV файл',
+        required=True,
+        attachment=True
+    )
+
+    filename = fields.Char(
+        string='Ім\'я файлу'
+    )
+
+    state = fields.Selection([
+        ('draft', 'Чернетка'),
+        ('validated', 'Перевірено'),
+        ('queued', 'В черзі'),
+        ('running', 'Виконується'),
+        ('failed', 'Помилка'),
+        ('done', 'Завершено')
+    ], string='Статус', default='draft', required=True, tracking=True)
+
+    total_rows = fields.Integer(
+        string='Рядків у файлі',
+        readonly=True
+    )
+
+    checkpoint = fields.Integer(
+        string='Оброблено рядків',
+        readonly=True,
+        help='Номер останнього обробленого рядка; імпорт продовжується з нього'
+    )
+
+    imported_count = fields.Integer(
+        string='Створено активів',
+        readonly=True
+    )
+
+    error_count = fields.Integer(
+        string='Рядків з помилками',
+        compute='_compute_error_count'
+    )
+
+    progress = fields.Float(
+        string='Прогрес (%)',
+        compute='_compute_progress'
+    )
+
+    rows_per_second = fields.Float(
+        string='Рядків/с',
+        readonly=True
+    )
+
+    last_error = fields.Text(
+        string='Остання помилка',
+        readonly=True
+    )
+
+    error_ids = fields.One2many(
+        'it.asset.import.error',
+        'import_id',
+        string='Помилки'
+    )
+
+    def _compute_error_count(self):
+        counts = dict(self.env['it.asset.import.error']._read_group(
+            [('import_id', 'in', self.ids)], ['import_id'], ['__count']
+        ))
+        for job in self:
+            job.error_count = counts.get(job, 0)
+
+    @api.depends('checkpoint', 'total_rows')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.checkpoint / job.total_rows if job.total_rows else 0.0
+
+    #Читання файлу та визначення посилань
+
+    def _read_rows(self):
+        """Рядки CSV як словники (нумерація рядків з 1, без заголовка)"""
+        self.ensure_one()
+        content = base64.b64decode(self.file).decode('utf-8-sig')
+        reader = csv.DictReader(io.StringIO(content))
+        missing = {'name', 'category'} - set(reader.fieldnames or [])
+        if missing:
+            raise UserError(_('У файлі відсутні обов\'язкові колонки: %s') % ', '.join(sorted(missing)))
+        return [{key: (value or '').strip() for key, value in row.items() if key in IMPORT_COLUMNS}
+                for row in reader]
+
+    def _resolve_references(self, rows):
+        """Категорії (за повною назвою або кодом) і співробітники (за email) - по одному пошуку"""
+        names = {row['category'] for row in rows if row.get('category')}
+        categories = {}
+        for category in self.env['it.asset.category'].search_fetch(
+            ['|', ('complete_name', 'in', list(names)), ('code', 'in', list(names))],
+            ['complete_name', 'code'],
+        ):
+            categories[category.complete_name] = category.id
+            if category.code:
+                categories.setdefault(category.code, category.id)
+
+        emails = {row['employee'].lower() for row in rows if row.get('employee')}
+        employees = {}
+        if emails:
+            for partner in self.env['res.partner'].search_fetch(
+                [('email_normalized', 'in', list(emails))], ['email_normalized'],
+            ):
+                employees.setdefault(partner.email_normalized, partner.id)
+        return categories, employees
+
+    def _prepare_vals(self, row, categories, employees, states):
+        """Значення для створення активу або текст помилки"""
+        if not row.get('name'):
+            return None, _('Не вказано назву активу')
+        category_id = categories.get(row.get('category'))
+        if not category_id:
+            return None, _('Категорію "%s" не знайдено') % row.get('category')
+        vals = {
+            'name': row['name'],
+            'category_id': category_id,
+            'serial_number': row.get('serial_number') or False,
+            'manufacturer': row.get('manufacturer') or False,
+            'model': row.get('model') or False,
+            'specifications': row.get('specifications') or False,
+        }
+        if row.get('code'):
+            vals['code'] = row['code']
+        if row.get('employee'):
+            vals['employee_id'] = employees.get(row['employee'].lower())
+            if not vals['employee_id']:
+                return None, _('Співробітника з email "%s" не знайдено') % row['employee']
+        if row.get('state'):
+            if row['state'] not in states:
+                return None, _('Невідомий статус "%s"') % row['state']
+            vals['state'] = row['state']
+        try:
+            for field_name in ('purchase_date', 'warranty_end_date'):
+                if row.get(field_name):
+                    vals[field_name] = fields.Date.to_date(row[field_name])
+            if row.get('purchase_price'):
+                vals['purchase_price'] = float(row['purchase_price'].replace(',', '.'))
+        except ValueError as error:
+            return None, str(error)
+        return vals, None
+
+    #Дії
+
+    def action_validate(self):
+        """Попередня перевірка всіх рядків; помилки зберігаються по номеру рядка"""
+        states = dict(self.env['it.asset']._fields['state'].selection)
+        for job in self:
+            rows = job._read_rows()
+            categories, employees = job._resolve_references(rows)
+            errors = []
+            codes = {}
+            for index, row in enumerate(rows, 1):
+                __, message = job._prepare_vals(row, categories, employees, states)
+                if not message and row.get('code') in codes:
+                    message = _('Інвентарний номер %s повторюється у файлі') % row['code']
+                if message:
+                    errors.append({'import_id': job.id, 'row': index, 'message': message})
+                elif row.get('code'):
+                    codes[row['code']] = index
+            #Інвентарні номери, що вже існують в БД
+            if codes:
+                for asset in self.env['it.asset'].with_context(active_test=False).search_fetch(
+                    [('code', 'in', list(codes))], ['code']
+                ):
+                    errors.append({
+                        'import_id': job.id,
+                        'row': codes[asset.code],
+                        'message': _('Інвентарний номер %s вже існує') % asset.code,
+                    })
+            job.error_ids.unlink()
+            self.env['it.asset.import.error'].create(errors)
+            job.write({'state': 'validated', 'total_rows': len(rows), 'checkpoint': 0, 'last_error': False})
+
+    def action_run(self):
+        """Постановка імпорту в чергу (виконується cron-задачею частинами)"""
+        for job in self:
+            if job.state not in ('validated', 'failed'):
+                raise UserError(_('Спочатку перевірте файл імпорту.'))
+        self.write({'state': 'queued', 'last_error': False})
+        self.env.ref('it_asset_management.ir_cron_it_asset_import')._trigger()
+
+    @api.model
+    def _cron_process(self):
+        """
+        Обробка задач у черзі; після досягнення ліміту часу cron перезапускається.
+        Задача з помилкою поза рядками (некоректний файл тощо) позначається як
+        "Помилка" і не блокує наступні задачі черги.
+        """
+        deadline = time.monotonic() + IMPORT_TIME_LIMIT
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            try:
+                finished = job._process(deadline)
+            except Exception as error:
+                self.env.cr.rollback()
+                _logger.exception("it.asset.import %s: імпорт зупинено з помилкою", job.id)
+                job.write({'state': 'failed', 'last_error': str(error)})
+                self.env.cr.commit()
+                continue
+            if not finished:
+                self.env.ref('it_asset_management.ir_cron_it_asset_import')._trigger()
+                break
+
+    def _process(self, deadline):
+        """
+        Створення активів частинами від checkpoint.
+        Кожна частина і новий checkpoint фіксуються одним commit,
+        тому при збої втрачається щонайбільше одна частина. Частина з помилкою
+        повторюється по одному рядку, некоректні рядки потрапляють у помилки.
+        Повертає True, якщо задача завершена.
+        """
+        self.ensure_one()
+        self.state = 'running'
+        self.env.cr.commit()
+
+        states = dict(self.env['it.asset']._fields['state'].selection)
+        rows = self._read_rows()
+        categories, employees = self._resolve_references(rows)
+        skip = set(self.error_ids.mapped('row'))
+        Asset = self.env['it.asset'].with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+        )
+
+        started = time.monotonic()
+        start_row = self.checkpoint
+        while self.checkpoint < len(rows):
+            if time.monotonic() > deadline:
+                return False
+            first = self.checkpoint
+            last = min(first + IMPORT_CHUNK_SIZE, len(rows))
+            chunk = []
+            for index in range(first + 1, last + 1):
+                if index in skip:
+                    continue
+                vals, __ = self._prepare_vals(rows[index - 1], categories, employees, states)
+                if vals:
+                    chunk.append((index, vals))
+            try:
+                Asset.create([vals for __, vals in chunk])
+                self.env.flush_all()
+                created = len(chunk)
+            except Exception:
+                #Відкат тільки поточної частини - попередні вже зафіксовані
+                self.env.cr.rollback()
+                _logger.warning("it.asset.import %s: помилка в рядках %s-%s, повтор по одному рядку",
+                                self.id, first + 1, last, exc_info=True)
+                created = self._process_rows(Asset, chunk)
+
+            elapsed = time.monotonic() - started
+            self.write({
+                'checkpoint': last,
+                'imported_count': self.imported_count + created,
+                'rows_per_second': (last - start_row) / elapsed if elapsed else 0.0,
+            })
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+        self.state = 'done'
+        self.message_post(body=_('Імпорт завершено: створено %(count)s активів, %(speed).0f рядків/с, '
+                                 'рядків з помилками: %(errors)s') % {
+            'count': self.imported_count,
+            'speed': self.rows_per_second,
+            'errors': self.error_count,
+        })
+        self.env.cr.commit()
+        return True
+
+    def _process_rows(self, Asset, chunk):
+        """
+        Створення частини по одному рядку, кожен у своєму savepoint.
+        Рядки з помилкою зберігаються в it.asset.import.error і пропускаються,
+        тому один некоректний рядок не блокує решту файлу.
+        """
+        created = 0
+        errors = []
+        for index, vals in chunk:
+            try:
+                with self.env.cr.savepoint():
+                    Asset.create(vals)
+                    self.env.flush_all()
+                created += 1
+            except Exception as error:
+                self.env.invalidate_all()
+                errors.append({'import_id': self.id, 'row': index, 'message': str(error)[:250]})
+        self.env['it.asset.import.error'].create(errors)
+        if errors:
+            self.last_error = _('Рядків з помилками під час створення: %s (рядки %s-%s)') % (
+                len(errors), errors[0]['row'], errors[-1]['row'])
+        return created
+
+
+class ITAssetImportError(models.Model):
+    """Помилка перевірки конкретного рядка файлу імпорту"""
+    _name = 'it.asset.import.error'
+    _description = 'IT Asset Import Error'
+    _order = 'row'
+
+    import_id = fields.Many2one(
+        'it.asset.import',
+        string='Імпорт',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    row = fields.Integer(
+        string='Рядок'
+    )
+
+    message = fields.Char(
+        string='Помилка'
+    )
@@ -0,0 +1,281 @@
+from collections import defaultdict
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+
+class ITAssetInventory(models.Model):
+    """
+    Сесія фізичної інвентаризації активів.
+    Приймає пакети відсканованих кодів і звіряє їх з очікуваним набором
+    активів (за співробітником / категорією / статусом) одним SQL запитом.
+    """
+    _name = 'it.asset.inventory'
+    _description = 'IT Asset Inventory Session'
+    _inherit = ['mail.thread']
+    _order = 'date desc, id desc'
+
+    name = fields.Char(
+        string='Назва',
+        required=True,
+        default=lambda self: _('Інвентаризація %s') % fields.Date.context_today(self)
+    )
+
+    date = fields.Date(
+        string='Дата',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    state = fields.Selection([
+        ('draft', 'Чернетка'),
+        ('in_progress', 'Сканування'),
+        ('done', 'Завершено')
+    ], string='Статус', default='draft', required=True, tracking=True)
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Відповідальний',
+        default=lambda self: self.env.user
+    )
+
+    #Фільтри очікуваного набору активів
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Співробітник',
+        domain=[('is_company', '=', False)],
+        help='Перевіряти тільки активи, закріплені за цим співробітником'
+    )
+
+    category_id = fields.Many2one(
+        'it.asset.category',
+        string='Категорія',
+        help='Перевіряти активи цієї категорії та всіх підкатегорій'
+    )
+
+    asset_state = fields.Selection(
+        selection=lambda self: self.env['it.asset']._fields['state'].selection,
+        string='Статус активів'
+    )
+
+    scan_ids = fields.One2many(
+        'it.asset.inventory.scan',
+        'inventory_id',
+        string='Скани'
+    )
+
+    line_ids = fields.One2many(
+        'it.asset.inventory.line',
+        'inventory_id',
+        string='Результати'
+    )
+
+    scan_count = fields.Integer(
+        string='Відскановано',
+        compute='_compute_counts'
+    )
+
+    found_count = fields.Integer(
+        string='Знайдено',
+        compute='_compute_counts'
+    )
+
+    missing_count = fields.Integer(
+        string='Відсутні',
+        compute='_compute_counts'
+    )
+
+    unexpected_count = fields.Integer(
+        string='Неочікувані',
+        compute='_compute_counts'
+    )
+
+    misassigned_count = fields.Integer(
+        string='Не у того співробітника',
+        compute='_compute_counts'
+    )
+
+    def _compute_counts(self):
+        """Підсумки звірки одним GROUP BY на всі сесії"""
+        results = defaultdict(dict)
+        for inventory, result, count in self.env['it.asset.inventory.line']._read_group(
+            [('inventory_id', 'in', self.ids)], ['inventory_id', 'result'], ['__count']
+        ):
+            results[inventory.id][result] = count
+        scans = dict(self.env['it.asset.inventory.scan']._read_group(
+            [('inventory_id', 'in', self.ids)], ['inventory_id'], ['__count']
+        ))
+        for inventory in self:
+            counts = results.get(inventory.id, {})
+            inventory.scan_count = scans.get(inventory, 0)
+            inventory.found_count = counts.get('found', 0)
+            inventory.missing_count = counts.get('missing', 0)
+            inventory.unexpected_count = counts.get('unexpected', 0)
+            inventory.misassigned_count = counts.get('misassigned', 0)
+
+    def action_start(self):
+        """Початок сканування"""
+        self.write({'state': 'in_progress'})
+
+    def add_scans(self, codes, employee_id=False):
+        """
+        Додавання пакета відсканованих кодів (інвентарний або серійний номер).
+        Активи визначаються одним пошуком по індексованих полях для всього пакета.
+        employee_id - у кого фізично знайдено активи під час обходу.
+        """
+        self.ensure_one()
+        if self.state != 'in_progress':
+            raise UserError(_('Сканування можливе тільки для активної інвентаризації.'))
+        codes = [code.strip() for code in codes if code and code.strip()]
+        assets = self.env['it.asset'].with_context(active_test=False).search_fetch(
+            ['|', ('code', 'in', codes), ('serial_number', 'in', codes)],
+            ['code', 'serial_number'],
+        )
+        by_code = {asset.serial_number: asset.id for asset in assets if asset.serial_number}
+        by_code.update({asset.code: asset.id for asset in assets})
+        return self.env['it.asset.inventory.scan'].create([{
+            'inventory_id': self.id,
+            'scanned_code': code,
+            'asset_id': by_code.get(code, False),
+            'employee_id': employee_id,
+        } for code in codes])
+
+    def action_reconcile(self):
+        """
+        Звірка відсканованих кодів з очікуваним набором активів.
+        Результат (відсутні, неочікувані, не у того співробітника, знайдені)
+        записується одним INSERT ... SELECT.
+        """
+        Line = self.env['it.asset.inventory.line']
+        for inventory in self:
+            self.env.flush_all()
+            self.env.cr.execute(
+                "DELETE FROM it_asset_inventory_line WHERE inventory_id = %s", (inventory.id,)
+            )
+            category_path = inventory.category_id.parent_path
+            self.env.cr.execute("""
+                WITH expected AS (
+                    SELECT asset.id, asset.employee_id
+                      FROM it_asset asset
+                      JOIN it_asset_category category ON category.id = asset.category_id
+                     WHERE asset.active
+                       AND (%(employee)s IS NULL OR asset.employee_id = %(employee)s)
+                       AND (%(category_path)s IS NULL OR category.parent_path LIKE %(category_path)s || '%%')
+                       AND (%(asset_state)s IS NULL OR asset.state = %(asset_state)s)
+                ),
+                scanned AS (
+                    SELECT DISTINCT ON (COALESCE(scan.asset_id::varchar, scan.scanned_code))
+                           scan.asset_id, scan.scanned_code, scan.employee_id
+                      FROM it_asset_inventory_scan scan
+                     WHERE scan.inventory_id = %(inventory)s
+                     ORDER BY COALESCE(scan.asset_id::varchar, scan.scanned_code), scan.id DESC
+                )
+                INSERT INTO it_asset_inventory_line
+                       (inventory_id, asset_id, scanned_code, result,
+                        expected_employee_id, scanned_employee_id,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT %(inventory)s, expected.id, NULL, 'missing',
+                       expected.employee_id, NULL,
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM expected
+                 WHERE NOT EXISTS (SELECT 1 FROM scanned WHERE scanned.asset_id = expected.id)
+                UNION ALL
+                SELECT %(inventory)s, scanned.asset_id, scanned.scanned_code,
+                       CASE
+                           WHEN expected.id IS NULL THEN 'unexpected'
+                           WHEN scanned.employee_id IS NOT NULL
+                                AND scanned.employee_id IS DISTINCT FROM expected.employee_id THEN 'misassigned'
+                           ELSE 'found'
+                       END,
+                       asset.employee_id, scanned.employee_id,
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM scanned
+                  LEFT JOIN expected ON expected.id = scanned.asset_id
+                  LEFT JOIN it_asset asset ON asset.id = scanned.asset_id
+            """, {
+                'inventory': inventory.id,
+                'employee': inventory.employee_id.id or None,
+                'category_path': category_path or None,
+                'asset_state': inventory.asset_state or None,
+                'uid': self.env.uid,
+            })
+        Line.invalidate_model()
+        self.invalidate_recordset(['line_ids'])
+
+    def action_done(self):
+        """Завершення інвентаризації з фінальною звіркою"""
+        self.action_reconcile()
+        self.write({'state': 'done'})
+
+
+class ITAssetInventoryScan(models.Model):
+    """Один відсканований код у межах сесії інвентаризації"""
+    _name = 'it.asset.inventory.scan'
+    _description = 'IT Asset Inventory Scan'
+    _order = 'id desc'
+
+    inventory_id = fields.Many2one(
+        'it.asset.inventory',
+        string='Інвентаризація',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    scanned_code = fields.Char(
+        string='Відсканований код',
+        required=True
+    )
+
+    asset_id = fields.Many2one(
+        'it.asset',
+        string='Актив',
+        ondelete='set null'
+    )
+
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Знайдено у'
+    )
+
+
+class ITAssetInventoryLine(models.Model):
+    """Результат звірки для одного активу або невідомого коду"""
+    _name = 'it.asset.inventory.line'
+    _description = 'IT Asset Inventory Result'
+    _order = 'result, id'
+
+    inventory_id = fields.Many2one(
+        'it.asset.inventory',
+        string='Інвентаризація',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    asset_id = fields.Many2one(
+        'it.asset',
+        string='Актив',
+        ondelete='cascade'
+    )
+
+    scanned_code = fields.Char(
+        string='Відсканований код'
+    )
+
+    result = fields.Selection([
+        ('found', 'Знайдено'),
+        ('missing', 'Відсутній'),
+        ('unexpected', 'Неочікуваний'),
+        ('misassigned', 'Не у того співробітника')
+    ], string='Результат', required=True)
+
+    expected_employee_id = fields.Many2one(
+        'res.partner',
+        string='Закріплений за'
+    )
+
+    scanned_employee_id = fields.Many2one(
+        'res.partner',
+        string='Знайдено у'
+    )
@@ -1,5 +1,8 @@
+from collections import defaultdict
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import sql
 
 
 class ITAssetMovement(models.Model):
@@ -56,6 +59,7 @@ class ITAssetMovement(models.Model):
         string='Дата переміщення',
         required=True,
         default=fields.Date.today,
+        index=True,
         tracking=True,
         help='Коли відбулося переміщення'
     )
@@ -101,33 +105,81 @@ class ITAssetMovement(models.Model):
         help='Категорія активу'
     )
 
-    @api.model
-    def create(self, vals):
-        """При створенні генеруємо номер переміщення та оновлюємо актив"""
-        #Генерація послідовного номера
-        if vals.get('name', '/') == '/':
-            vals['name'] = self.env['ir.sequence'].next_by_code(
-                'it.asset.movement'
-            ) or '/'
-
-        #Створення переміщення
-        movement = super().create(vals)
-
-        #Оновлення співробітника в активі
-        if movement.asset_id:
-            movement.asset_id.write({
-                'employee_id': movement.employee_id.id
+    def init(self):
+        """Індекс для історії переміщень активу (asset_id + сортування за датою)"""
+        sql.create_index(
+            self.env.cr, 'it_asset_movement_asset_date_index', self._table,
+            ['asset_id', 'movement_date DESC', 'id DESC'],
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """При створенні генеруємо номери переміщень та оновлюємо активи пакетно"""
+        Asset = self.env['it.asset']
+
+        #Попередній співробітник за замовчуванням - поточний власник активу, а для
+        #кількох переміщень одного активу в пакеті - отримувач попереднього (за датою і порядком)
+        asset_ids = {vals['asset_id'] for vals in vals_list if vals.get('asset_id')}
+        holders = {asset.id: asset.employee_id.id for asset in Asset.browse(asset_ids)}
+        today = fields.Date.context_today(self)
+        chain = sorted(
+            (index for index, vals in enumerate(vals_list) if vals.get('asset_id')),
+            key=lambda index: (fields.Date.to_date(vals_list[index].get('movement_date')) or today, index),
+        )
+        for index in chain:
+            vals = vals_list[index]
+            if 'previous_employee_id' not in vals:
+                vals['previous_employee_id'] = holders.get(vals['asset_id']) or False
+            holders[vals['asset_id']] = vals.get('employee_id') or False
+
+        #Генерація послідовних номерів одним блоком
+        pending = [vals for vals in vals_list if vals.get('name', '/') == '/']
+        if pending:
+            names = self.env['ir.sequence'].next_block_by_code('it.asset.movement', len(pending))
+            for vals, name in zip(pending, names):
+                vals['name'] = name or '/'
+
+        #Створення переміщень
+        movements = super().create(vals_list)
+        self.env['it.asset.custody']._apply_movements(movements)
+        if not self.env.context.get('it_asset_movement_skip_apply'):
+            movements._apply_to_assets()
+        return movements
+
+    def _apply_to_assets(self):
+        """
+        Оновлення співробітника в активах згрупованими UPDATE
+        і одне пакетне повідомлення в chatter для всіх активів.
+        """
+        movements = self.filtered('asset_id')
+        if not movements:
+            return
+
+        #Для кожного активу діє останнє переміщення
+        latest = {}
+        for movement in movements.sorted(lambda m: (m.movement_date, m.id)):
+            latest[movement.asset_id.id] = movement
+
+        groups = defaultdict(list)
+        for asset_id, movement in latest.items():
+            groups[(movement.employee_id.id, movement.movement_date)].append(asset_id)
+
+        Asset = self.env['it.asset'].with_context(tracking_disable=True, it_asset_skip_movements=True)
+        for (employee_id, movement_date), asset_ids in groups.items():
+            Asset.browse(asset_ids).write({
+                'employee_id': employee_id,
+                'assignment_date': movement_date,
             })
 
-            #Створення повідомлення в chatter активу
-            movement.asset_id.message_post(
-                body=_('Актив переміщено від %(from_emp)s до %(to_emp)s') % {
-                    'from_emp': movement.previous_employee_id.name or _('склад'),
-                    'to_emp': movement.employee_id.name,
-                }
-            )
-
-        return movement
+        #Створення повідомлень в chatter активів одним INSERT
+        bodies = {
+            asset_id: _('Актив переміщено від %(from_emp)s до %(to_emp)s') % {
+                'from_emp': movement.previous_employee_id.name or _('склад'),
+                'to_emp': movement.employee_id.name,
+            }
+            for asset_id, movement in latest.items()
+        }
+        self.env['it.asset'].browse(list(bodies))._message_log_batch(bodies)
 
     @api.constrains('previous_employee_id', 'employee_id')
     def _check_employees(self):
@@ -0,0 +1,164 @@
+import functools
+import logging
+import threading
+import time
+
+from odoo import models, fields, api
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+#Скільки днів зберігаються виміри
+PERF_SAMPLE_RETENTION_DAYS = 7
+
+
+def _profiling_threshold(env):
+    """
+    Поріг повільного виклику в мс, або None якщо профілювання вимкнено.
+    Вмикається параметром it_asset_management.profiling = 1 (get_param кешується).
+    """
+    params = env['ir.config_parameter'].sudo()
+    if params.get_param('it_asset_management.profiling') not in ('1', 'True', 'true'):
+        return None
+    return float(params.get_param('it_asset_management.slow_call_ms', 500))
+
+
+def instrument(func):
+    """
+    Декоратор для маршрутів порталу та workflow методів моделей.
+    Якщо профілювання ввімкнено, записує кількість запитів, час SQL,
+    час Python і час рендерингу QWeb кожного виклику в it.asset.perf.sample,
+    а виклики довші за поріг пише в лог.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        env = self.env if isinstance(self, models.BaseModel) else request.env
+        threshold = _profiling_threshold(env)
+        if threshold is None:
+            return func(self, *args, **kwargs)
+
+        thread = threading.current_thread()
+        cr = env.cr
+        queries_start = cr.sql_log_count
+        sql_start = getattr(thread, 'query_time', 0.0)
+        started = time.perf_counter()
+
+        result = func(self, *args, **kwargs)
+
+        #Відкладений QWeb рендеринг виконується тут, щоб виміряти його окремо
+        render_time = 0.0
+        if getattr(result, 'is_qweb', False):
+            render_start = time.perf_counter()
+            result.flatten()
+            render_time = time.perf_counter() - render_start
+
+        total_time = time.perf_counter() - started
+        sql_time = getattr(thread, 'query_time', 0.0) - sql_start
+        name = '%s.%s' % (self._name if isinstance(self, models.BaseModel) else type(self).__name__, func.__name__)
+        env['it.asset.perf.sample']._record(
+            name, cr.sql_log_count - queries_start, total_time, sql_time, render_time,
+        )
+        if total_time * 1000 >= threshold:
+            _logger.warning(
+                "it.asset: повільний виклик %s: %.0f мс (%d запитів, SQL %.0f мс, Python %.0f мс, QWeb %.0f мс)",
+                name, total_time * 1000, cr.sql_log_count - queries_start, sql_time * 1000,
+                (total_time - sql_time) * 1000, render_time * 1000,
+            )
+        return result
+    return wrapper
+
+
+class ITAssetPerfSample(models.Model):
+    """
+    Вимір одного виклику маршруту порталу або workflow методу.
+    Записується одним INSERT в обхід ORM, щоб не спотворювати виміри;
+    агрегати (перцентилі) рахуються в PostgreSQL.
+    """
+    _name = 'it.asset.perf.sample'
+    _description = 'IT Asset Call Timing Sample'
+    _order = 'id desc'
+    _log_access = False
+
+    name = fields.Char(
+        string='Виклик',
+        required=True,
+        index=True
+    )
+
+    date = fields.Datetime(
+        string='Час',
+        required=True,
+        index=True
+    )
+
+    query_count = fields.Integer(
+        string='Запитів'
+    )
+
+    total_ms = fields.Float(
+        string='Загальний час, мс'
+    )
+
+    sql_ms = fields.Float(
+        string='SQL, мс'
+    )
+
+    python_ms = fields.Float(
+        string='Python, мс'
+    )
+
+    render_ms = fields.Float(
+        string='QWeb, мс'
+    )
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Користувач',
+        ondelete='set null'
+    )
+
+    @api.model
+    def _record(self, name, query_count, total_time, sql_time, render_time):
+        self.env.cr.execute("""
+            INSERT INTO it_asset_perf_sample
+                   (name, date, query_count, total_ms, sql_ms, python_ms, render_ms, user_id)
+            VALUES (%s, now() at time zone 'UTC', %s, %s, %s, %s, %s, %s)
+        """, (
+            name, query_count, total_time * 1000, sql_time * 1000,
+            (total_time - sql_time) * 1000, render_time * 1000, self.env.uid,
+        ))
+
+    @api.model
+    def _get_statistics(self, hours=24):
+        """Перцентилі часу і кількості запитів по кожному виклику за останні hours годин"""
+        self.env.cr.execute("""
+            SELECT name,
+                   count(*),
+                   percentile_cont(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY total_ms),
+                   percentile_cont(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY sql_ms),
+                   percentile_cont(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY render_ms),
+                   percentile_disc(ARRAY[0.5, 0.9, 0.99]) WITHIN GROUP (ORDER BY query_count),
+                   max(total_ms)
+              FROM it_asset_perf_sample
+             WHERE date >= now() at time zone 'UTC' - make_interval(hours => %s)
+          GROUP BY name
+          ORDER BY name
+        """, (int(hours),))
+        percentiles = ('p50', 'p90', 'p99')
+        return [{
+            'name': name,
+            'calls': calls,
+            'total_ms': dict(zip(percentiles, total_ms)),
+            'sql_ms': dict(zip(percentiles, sql_ms)),
+            'render_ms': dict(zip(percentiles, render_ms)),
+            'query_count': dict(zip(percentiles, query_count)),
+            'max_ms': max_ms,
+        } for name, calls, total_ms, sql_ms, render_ms, query_count, max_ms in self.env.cr.fetchall()]
+
+    @api.autovacuum
+    def _gc_samples(self):
+        """Видалення вимірів старших за PERF_SAMPLE_RETENTION_DAYS"""
+        self.env.cr.execute("""
+            DELETE FROM it_asset_perf_sample
+             WHERE date < now() at time zone 'UTC' - make_interval(days => %s)
+        """, (PERF_SAMPLE_RETENTION_DAYS,))
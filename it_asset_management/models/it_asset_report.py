@@ -0,0 +1,206 @@
+from odoo import models, fields, api, tools
+
+
+class ITAssetReport(models.Model):
+    """
+    Звітна модель для аналітики по активах, заявках і переміщеннях.
+    Дані попередньо агреговані по місяцях і категоріях у materialized view,
+    тому pivot/graph не сканують операційні таблиці при кожному оновленні.
+    Оновлюється cron-задачею (REFRESH MATERIALIZED VIEW CONCURRENTLY).
+    """
+    _name = 'it.asset.report'
+    _description = 'IT Asset Analytics'
+    _auto = False
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    #Виміри
+    date = fields.Date(
+        string='Місяць',
+        readonly=True
+    )
+
+    category_id = fields.Many2one(
+        'it.asset.category',
+        string='Категорія',
+        readonly=True
+    )
+
+    asset_state = fields.Selection(
+        selection='_selection_asset_state',
+        string='Статус активу',
+        readonly=True
+    )
+
+    request_state = fields.Selection(
+        selection='_selection_request_state',
+        string='Статус заявки',
+        readonly=True
+    )
+
+    request_type = fields.Selection(
+        selection='_selection_request_type',
+        string='Тип заявки',
+        readonly=True
+    )
+
+    #Показники
+    asset_count = fields.Integer(
+        string='Кількість активів',
+        readonly=True
+    )
+
+    purchase_value = fields.Float(
+        string='Вартість придбання',
+        readonly=True
+    )
+
+    request_count = fields.Integer(
+        string='Кількість заявок',
+        readonly=True
+    )
+
+    resolved_count = fields.Integer(
+        string='Виконано заявок',
+        readonly=True
+    )
+
+    resolution_days_total = fields.Integer(
+        string='Днів на виконання (сума)',
+        readonly=True
+    )
+
+    resolution_days = fields.Float(
+        string='Середній час виконання (дні)',
+        group_operator='avg',
+        readonly=True
+    )
+
+    movement_count = fields.Integer(
+        string='Кількість переміщень',
+        readonly=True
+    )
+
+    @api.model
+    def _selection_asset_state(self):
+        return self.env['it.asset']._fields['state'].selection
+
+    @api.model
+    def _selection_request_state(self):
+        return self.env['it.asset.request']._fields['state'].selection
+
+    @api.model
+    def _selection_request_type(self):
+        return self.env['it.asset.request']._fields['request_type'].selection
+
+    @staticmethod
+    def _selection_array(selection):
+        """Значення selection як SQL масив (позиція значення входить в id рядка)"""
+        return "ARRAY[%s]::varchar[]" % ", ".join("'%s'" % value for value, __ in selection)
+
+    def _query(self):
+        """
+        Агрегати по активах, заявках і переміщеннях в розрізі місяць/категорія.
+        id рядка виводиться з ключів групування (категорія, місяць, статус, тип),
+        тому між оновленнями він не змінюється і REFRESH CONCURRENTLY
+        переписує тільки змінені рядки.
+        """
+        return """
+            SELECT ((COALESCE(lines.category_id, 0)::bigint * 100000
+                     + (EXTRACT(YEAR FROM lines.date) * 12 + EXTRACT(MONTH FROM lines.date))::bigint) * 100
+                    + CASE WHEN lines.asset_state IS NOT NULL
+                               THEN COALESCE(array_position(%(asset_states)s, lines.asset_state), 49)
+                           WHEN lines.request_state IS NOT NULL
+                               THEN 50 + COALESCE(array_position(%(request_states)s, lines.request_state), 49)
+                           ELSE 0 END) * 100
+                   + COALESCE(array_position(%(request_types)s, lines.request_type), 0) AS id,
+                   lines.*
+              FROM (
+                    SELECT date_trunc('month', COALESCE(asset.purchase_date, asset.create_date))::date AS date,
+                           asset.category_id AS category_id,
+                           asset.state::varchar AS asset_state,
+                           NULL::varchar AS request_state,
+                           NULL::varchar AS request_type,
+                           COUNT(*) AS asset_count,
+                           COALESCE(SUM(asset.purchase_price), 0) AS purchase_value,
+                           0 AS request_count,
+                           0 AS resolved_count,
+                           0 AS resolution_days_total,
+                           NULL::double precision AS resolution_days,
+                           0 AS movement_count
+                      FROM it_asset asset
+                     GROUP BY 1, 2, 3
+
+                    UNION ALL
+
+                    SELECT date_trunc('month', req.request_date)::date,
+                           COALESCE(req.category_id, asset.category_id),
+                           NULL,
+                           req.state,
+                           req.request_type,
+                           0,
+                           0,
+                           COUNT(*),
+                           COUNT(req.completion_date),
+                           COALESCE(SUM(req.completion_date - req.request_date), 0),
+                           AVG(req.completion_date - req.request_date),
+                           0
+                      FROM it_asset_request req
+                      LEFT JOIN it_asset asset ON asset.id = req.asset_id
+                     GROUP BY 1, 2, 4, 5
+
+                    UNION ALL
+
+                    SELECT date_trunc('month', movement.movement_date)::date,
+                           asset.category_id,
+                           NULL,
+                           NULL,
+                           NULL,
+                           0,
+                           0,
+                           0,
+                           0,
+                           0,
+                           NULL,
+                           COUNT(*)
+                      FROM it_asset_movement movement
+                      JOIN it_asset asset ON asset.id = movement.asset_id
+                     GROUP BY 1, 2
+              ) AS lines
+        """ % {
+            'asset_states': self._selection_array(self._selection_asset_state()),
+            'request_states': self._selection_array(self._selection_request_state()),
+            'request_types': self._selection_array(self._selection_request_type()),
+        }
+
+    def init(self):
+        """Створення materialized view з унікальним індексом для конкурентного оновлення"""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(
+            "CREATE MATERIALIZED VIEW %s AS (%s)" % (self._table, self._query())
+        )
+        self.env.cr.execute(
+            "CREATE UNIQUE INDEX %s_id_index ON %s (id)" % (self._table, self._table)
+        )
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """Середній час виконання = сума днів / кількість виконаних у кожній групі (а не середнє середніх)"""
+        names = {spec.split(':')[0] for spec in fields}
+        extra = [] if 'resolution_days' not in names else [
+            '%s:sum' % name for name in ('resolution_days_total', 'resolved_count') if name not in names
+        ]
+        groups = super().read_group(domain, list(fields) + extra, groupby, offset=offset, limit=limit,
+                                    orderby=orderby, lazy=lazy)
+        if 'resolution_days' in names:
+            for group in groups:
+                resolved = group.get('resolved_count') or 0
+                group['resolution_days'] = (group.get('resolution_days_total') or 0) / resolved if resolved else False
+        return groups
+
+    @api.model
+    def _refresh(self):
+        """Оновлення агрегатів без блокування читання звітів (викликається cron)"""
+        self.env.flush_all()
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_model()
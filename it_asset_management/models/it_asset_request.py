@@ -1,5 +1,15 @@
+import logging
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import sql, SQL
+
+from .it_asset_perf import instrument
+
+_logger = logging.getLogger(__name__)
+
+#Поля, від яких залежать термін і прострочення SLA
+SLA_TRIGGER_FIELDS = {'request_date', 'priority', 'state', 'completion_date'}
 
 
 class ITAssetRequest(models.Model):
@@ -46,6 +56,7 @@ class ITAssetRequest(models.Model):
         'it.asset',
         string='Актив',
         help='Заповнюється для заявок типу "Ремонт" або "Заміна"',
+        index='btree_not_null',
         tracking=True
     )
 
@@ -78,7 +89,7 @@ class ITAssetRequest(models.Model):
         ('done', 'Готово'),
         ('rejected', 'Відхилено'),
         ('cancelled', 'Скасовано')
-    ], string='Статус', default='draft', required=True, tracking=True)
+    ], string='Статус', default='draft', required=True, index=True, tracking=True)
 
     #Пріоритет виконання
     priority = fields.Selection([
@@ -112,6 +123,28 @@ class ITAssetRequest(models.Model):
         readonly=True
     )
 
+    #SLA (оновлюються одним UPDATE при зміні заявки і щоденною cron-задачею)
+    deadline = fields.Date(
+        string='Термін SLA',
+        readonly=True,
+        copy=False,
+        index=True,
+        help='Дата заявки + час виконання для її пріоритету'
+    )
+
+    is_overdue = fields.Boolean(
+        string='Прострочено',
+        readonly=True,
+        copy=False
+    )
+
+    age_days = fields.Integer(
+        string='Вік (днів)',
+        readonly=True,
+        copy=False,
+        help='Днів від дати заявки до виконання (або до сьогодні для відкритих)'
+    )
+
     #Додаткова інформація
     comments = fields.Html(
         string='Коментарі'
@@ -123,12 +156,82 @@ class ITAssetRequest(models.Model):
         copy=False
     )
     
+    def init(self):
+        """Індекс під record rule requester_id = partner та сортування списку заявок"""
+        sql.create_index(
+            self.env.cr, 'it_asset_request_requester_date_index', self._table,
+            ['requester_id', 'request_date DESC', 'id DESC'],
+        )
+        #Фільтр "Прострочені" по відповідальному
+        sql.create_index(
+            self.env.cr, 'it_asset_request_overdue_index', self._table,
+            ['assigned_to_id', 'deadline'],
+            where='is_overdue',
+        )
+
     @api.model
     def create(self, vals):
         """Генерація автоматичного номера заявки при створенні"""
         if vals.get('name', _('New')) == _('New'):
             vals['name'] = self.env['ir.sequence'].next_by_code('it.asset.request') or _('New')
-        return super(ITAssetRequest, self).create(vals)
+        new_request = super(ITAssetRequest, self).create(vals)
+        self._refresh_sla(new_request.ids)
+        return new_request
+
+    def write(self, vals):
+        """Перерахунок SLA, якщо змінились дата, пріоритет або статус"""
+        result = super(ITAssetRequest, self).write(vals)
+        if SLA_TRIGGER_FIELDS.intersection(vals):
+            self._refresh_sla(self.ids)
+        return result
+
+    @api.model
+    def _refresh_sla(self, ids=None, include_closed=False):
+        """
+        Оновлення deadline/is_overdue/age_days одним UPDATE ... FROM.
+        Без ids - всі відкриті заявки (або всі, якщо include_closed).
+        Рядки, де значення не змінились, не перезаписуються.
+        """
+        if ids is not None and not ids:
+            return 0
+        self.flush_model(list(SLA_TRIGGER_FIELDS))
+        self.env['it.asset.request.sla'].flush_model()
+        if ids is not None:
+            where = SQL("req.id IN %s", tuple(ids))
+        elif include_closed:
+            where = SQL("TRUE")
+        else:
+            where = SQL("req.state NOT IN ('done', 'rejected', 'cancelled')")
+        today = fields.Date.context_today(self)
+        self.env.cr.execute(SQL("""
+            UPDATE it_asset_request target
+               SET deadline = data.deadline,
+                   is_overdue = data.is_overdue,
+                   age_days = data.age_days
+              FROM (
+                    SELECT req.id,
+                           req.request_date + sla.resolution_days AS deadline,
+                           COALESCE(req.completion_date, %(today)s) - req.request_date AS age_days,
+                           COALESCE(req.state NOT IN ('rejected', 'cancelled')
+                                    AND req.request_date + sla.resolution_days < COALESCE(req.completion_date, %(today)s),
+                                    FALSE) AS is_overdue
+                      FROM it_asset_request req
+                 LEFT JOIN it_asset_request_sla sla ON sla.priority = req.priority
+                     WHERE %(where)s
+                   ) data
+             WHERE target.id = data.id
+               AND (target.deadline, target.is_overdue, target.age_days)
+                   IS DISTINCT FROM (data.deadline, data.is_overdue, data.age_days)
+        """, today=today, where=where))
+        updated = self.env.cr.rowcount
+        self.invalidate_model(['deadline', 'is_overdue', 'age_days'])
+        return updated
+
+    @api.model
+    def _cron_refresh_sla(self):
+        """Щоденне оновлення віку і прострочення відкритих заявок"""
+        updated = self._refresh_sla()
+        _logger.info("it.asset.request: SLA оновлено для %d заявок", updated)
     
     @api.onchange('request_type')
     def _onchange_request_type(self):
@@ -143,6 +246,7 @@ class ITAssetRequest(models.Model):
             if request.request_type in ['repair', 'replacement'] and not request.asset_id:
                 raise ValidationError(_('Для заявок типу "Ремонт" або "Заміна" необхідно вказати актив.'))
     
+    @instrument
     def action_submit(self):
         """Подавання заявки на розгляд"""
         self.write({'state': 'submitted'})
@@ -152,6 +256,7 @@ class ITAssetRequest(models.Model):
             subject=_('Нова заявка на IT-актив')
         )
     
+    @instrument
     def action_start_progress(self):
         """Початок роботи над заявкою"""
         self.write({
@@ -159,10 +264,12 @@ class ITAssetRequest(models.Model):
             'assigned_to_id': self.env.user.id
         })
     
+    @instrument
     def action_approve(self):
         """Схвалення заявки"""
         self.write({'state': 'approved'})
     
+    @instrument
     def action_complete(self):
         """Завершення заявки"""
         self.write({
@@ -175,6 +282,7 @@ class ITAssetRequest(models.Model):
             partner_ids=[self.requester_id.id]
         )
     
+    @instrument
     def action_reject(self):
         """Відхилення заявки"""
         self.write({'state': 'rejected'})
@@ -184,6 +292,7 @@ class ITAssetRequest(models.Model):
             partner_ids=[self.requester_id.id]
         )
     
+    @instrument
     def action_cancel(self):
         """Скасування заявки"""
         self.write({'state': 'cancelled'})
@@ -0,0 +1,165 @@
+from odoo import models, fields, api, tools
+
+
+class ITAssetRequestSla(models.Model):
+    """
+    Цільовий час виконання заявки для кожного пріоритету.
+    Зміна цілей перераховує терміни всіх заявок одним UPDATE.
+    """
+    _name = 'it.asset.request.sla'
+    _description = 'IT Asset Request SLA Target'
+    _order = 'priority desc'
+    _rec_name = 'priority'
+
+    priority = fields.Selection(
+        selection='_selection_priority',
+        string='Пріоритет',
+        required=True
+    )
+
+    resolution_days = fields.Integer(
+        string='Час виконання (днів)',
+        required=True,
+        help='Кількість днів від дати заявки до терміну виконання'
+    )
+
+    _sql_constraints = [
+        ('priority_unique', 'unique(priority)', 'Для кожного пріоритету може бути тільки одна ціль SLA!'),
+        ('resolution_days_positive', 'CHECK(resolution_days >= 0)', 'Час виконання не може бути від\'ємним!'),
+    ]
+
+    @api.model
+    def _selection_priority(self):
+        """Пріоритети беруться з заявки"""
+        return self.env['it.asset.request']._fields['priority'].selection
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Нові цілі SLA перераховують терміни заявок"""
+        targets = super().create(vals_list)
+        self.env['it.asset.request']._refresh_sla(include_closed=True)
+        return targets
+
+    def write(self, vals):
+        """Зміна цілей SLA перераховує терміни заявок"""
+        result = super().write(vals)
+        self.env['it.asset.request']._refresh_sla(include_closed=True)
+        return result
+
+    def unlink(self):
+        """Видалення цілей SLA перераховує терміни заявок"""
+        result = super().unlink()
+        self.env['it.asset.request']._refresh_sla(include_closed=True)
+        return result
+
+
+class ITAssetRequestSlaReport(models.Model):
+    """
+    Дашборд SLA: заявки згруповані по відповідальному, типу, пріоритету і місяцю.
+    Будується з збережених полів deadline/is_overdue/age_days (оновлюються cron),
+    тому не рахує терміни при кожному читанні. Відсоток порушень
+    перераховується з сум у read_group для будь-якого групування.
+    """
+    _name = 'it.asset.request.sla.report'
+    _description = 'IT Asset Request SLA Dashboard'
+    _auto = False
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    #Виміри
+    date = fields.Date(
+        string='Місяць',
+        readonly=True
+    )
+
+    assigned_to_id = fields.Many2one(
+        'res.users',
+        string='Відповідальний',
+        readonly=True
+    )
+
+    request_type = fields.Selection(
+        selection='_selection_request_type',
+        string='Тип заявки',
+        readonly=True
+    )
+
+    priority = fields.Selection(
+        selection='_selection_priority',
+        string='Пріоритет',
+        readonly=True
+    )
+
+    #Показники
+    request_count = fields.Integer(
+        string='Кількість заявок',
+        readonly=True
+    )
+
+    breached_count = fields.Integer(
+        string='Порушено SLA',
+        readonly=True
+    )
+
+    open_overdue_count = fields.Integer(
+        string='Прострочені відкриті',
+        readonly=True
+    )
+
+    age_days_total = fields.Integer(
+        string='Вік заявок (днів, сума)',
+        readonly=True
+    )
+
+    breach_rate = fields.Float(
+        string='Відсоток порушень',
+        group_operator='avg',
+        readonly=True
+    )
+
+    @api.model
+    def _selection_request_type(self):
+        """Типи заявок беруться з заявки"""
+        return self.env['it.asset.request']._fields['request_type'].selection
+
+    @api.model
+    def _selection_priority(self):
+        """Пріоритети беруться з заявки"""
+        return self.env['it.asset.request']._fields['priority'].selection
+
+    def init(self):
+        """SQL view: заявки з терміном, згруповані за місяцем, виконавцем, типом і пріоритетом"""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT min(req.id) AS id,
+                       date_trunc('month', req.request_date)::date AS date,
+                       req.assigned_to_id,
+                       req.request_type,
+                       req.priority,
+                       COUNT(*) AS request_count,
+                       COUNT(*) FILTER (WHERE req.is_overdue) AS breached_count,
+                       COUNT(*) FILTER (WHERE req.is_overdue
+                                          AND req.state NOT IN ('done', 'rejected', 'cancelled')) AS open_overdue_count,
+                       COALESCE(SUM(req.age_days), 0) AS age_days_total,
+                       100.0 * COUNT(*) FILTER (WHERE req.is_overdue) / COUNT(*) AS breach_rate
+                  FROM it_asset_request req
+                 WHERE req.deadline IS NOT NULL
+              GROUP BY 2, 3, 4, 5
+            )
+        """ % self._table)
+
+    @api.model
+    def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        """Відсоток порушень = порушено / кількість у кожній групі (а не середнє відсотків)"""
+        names = {spec.split(':')[0] for spec in fields}
+        extra = [] if 'breach_rate' not in names else [
+            '%s:sum' % name for name in ('request_count', 'breached_count') if name not in names
+        ]
+        groups = super().read_group(domain, list(fields) + extra, groupby, offset=offset, limit=limit,
+                                    orderby=orderby, lazy=lazy)
+        if 'breach_rate' in names:
+            for group in groups:
+                total = group.get('request_count') or 0
+                group['breach_rate'] = 100.0 * (group.get('breached_count') or 0) / total if total else 0.0
+        return groups
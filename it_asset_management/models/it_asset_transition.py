@@ -0,0 +1,128 @@
+from odoo import models, fields, api, _
+
+
+class ITAssetTransition(models.Model):
+    """
+    Пакет масової зміни статусу активів.
+    Замість трекінгу в chatter кожного активу зберігає одне зведене
+    повідомлення на пакет, а значення старий → новий по кожному активу
+    записує в компактну таблицю рядків.
+    """
+    _name = 'it.asset.transition'
+    _description = 'IT Asset Bulk State Transition'
+    _inherit = ['mail.thread']
+    _mail_post_access = 'read'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Операція',
+        required=True,
+        readonly=True
+    )
+
+    new_state = fields.Selection(
+        selection=lambda self: self.env['it.asset']._fields['state'].selection,
+        string='Новий статус',
+        readonly=True
+    )
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Виконав',
+        default=lambda self: self.env.user,
+        readonly=True
+    )
+
+    asset_count = fields.Integer(
+        string='Кількість активів',
+        readonly=True
+    )
+
+    line_ids = fields.One2many(
+        'it.asset.transition.line',
+        'transition_id',
+        string='Активи'
+    )
+
+    @api.model
+    def _apply(self, assets, vals, name):
+        """
+        Масовий запис vals в активи: лог старих значень одним INSERT ... SELECT,
+        UPDATE без трекінгу і одне зведене повідомлення на весь пакет.
+        """
+        transition = self.create({
+            'name': name,
+            'new_state': vals.get('state'),
+            'asset_count': len(assets),
+        })
+        assets.flush_recordset(['state', 'employee_id'])
+        self.env['it.asset.transition.line'].flush_model()
+        self.env.cr.execute("""
+            INSERT INTO it_asset_transition_line
+                   (transition_id, asset_id, old_state, new_state, old_employee_id,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT %(transition)s, asset.id, asset.state, %(state)s, asset.employee_id,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM it_asset asset
+             WHERE asset.id IN %(ids)s
+        """, {
+            'transition': transition.id,
+            'state': vals.get('state'),
+            'uid': self.env.uid,
+            'ids': tuple(assets.ids),
+        })
+
+        assets.with_context(tracking_disable=True).write(vals)
+
+        #Одне зведене повідомлення замість трекінгу кожного активу
+        counts = dict(self.env['it.asset.transition.line']._read_group(
+            [('transition_id', '=', transition.id)],
+            ['old_state'],
+            ['__count'],
+        ))
+        states = dict(self.env['it.asset']._fields['state']._description_selection(self.env))
+        transition.message_post(body=_('%(name)s: %(count)s активів, %(summary)s → %(state)s') % {
+            'name': name,
+            'count': len(assets),
+            'summary': ', '.join('%s: %s' % (states.get(old, old), count) for old, count in counts.items()),
+            'state': states.get(vals.get('state'), vals.get('state')),
+        })
+        return transition
+
+
+class ITAssetTransitionLine(models.Model):
+    """Значення до/після масової зміни статусу для одного активу"""
+    _name = 'it.asset.transition.line'
+    _description = 'IT Asset Bulk State Transition Line'
+    _order = 'id'
+
+    transition_id = fields.Many2one(
+        'it.asset.transition',
+        string='Пакет',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    asset_id = fields.Many2one(
+        'it.asset',
+        string='Актив',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    old_state = fields.Selection(
+        selection=lambda self: self.env['it.asset']._fields['state'].selection,
+        string='Був статус'
+    )
+
+    new_state = fields.Selection(
+        selection=lambda self: self.env['it.asset']._fields['state'].selection,
+        string='Новий статус'
+    )
+
+    old_employee_id = fields.Many2one(
+        'res.partner',
+        string='Був закріплений за'
+    )
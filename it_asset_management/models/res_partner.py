@@ -0,0 +1,74 @@
+from odoo import models, fields, api
+
+
+class ResPartner(models.Model):
+    """
+    Лічильники активів і заявок співробітника для головної сторінки порталу.
+    Поля збережені в БД і перераховуються тільки при зміні активу або заявки
+    цього партнера, тому сторінка /my не виконує додаткових COUNT запитів.
+    """
+    _inherit = 'res.partner'
+
+    it_asset_ids = fields.One2many(
+        'it.asset',
+        'employee_id',
+        string='IT-активи'
+    )
+
+    it_asset_request_ids = fields.One2many(
+        'it.asset.request',
+        'requester_id',
+        string='Заявки на IT-активи'
+    )
+
+    it_asset_count = fields.Integer(
+        string='Закріплених активів',
+        compute='_compute_it_asset_count',
+        store=True
+    )
+
+    it_asset_request_count = fields.Integer(
+        string='Кількість заявок',
+        compute='_compute_it_asset_request_count',
+        store=True
+    )
+
+    it_asset_version = fields.Integer(
+        string='Версія списку активів',
+        default=0,
+        readonly=True,
+        copy=False,
+        help='Збільшується при зміні закріплених активів; ключ кешу форми заявки на порталі'
+    )
+
+    @api.depends('it_asset_ids.state', 'it_asset_ids.active')
+    def _compute_it_asset_count(self):
+        """Кількість активів у статусах 'Призначений' та 'У використанні'"""
+        counts = dict(self.env['it.asset']._read_group(
+            [('employee_id', 'in', self._origin.ids), ('state', 'in', ['assigned', 'in_use'])],
+            ['employee_id'],
+            ['__count'],
+        ))
+        for partner in self:
+            partner.it_asset_count = counts.get(partner._origin, 0)
+
+    @api.depends('it_asset_request_ids')
+    def _compute_it_asset_request_count(self):
+        """Кількість заявок, поданих партнером"""
+        counts = dict(self.env['it.asset.request']._read_group(
+            [('requester_id', 'in', self._origin.ids)],
+            ['requester_id'],
+            ['__count'],
+        ))
+        for partner in self:
+            partner.it_asset_request_count = counts.get(partner._origin, 0)
+
+    def _bump_it_asset_version(self):
+        """Нова версія списку активів (одним UPDATE, без трекінгу партнера)"""
+        if not self:
+            return
+        self.env.cr.execute(
+            "UPDATE res_partner SET it_asset_version = it_asset_version + 1 WHERE id IN %s",
+            (tuple(self.ids),)
+        )
+        self.invalidate_recordset(['it_asset_version'])
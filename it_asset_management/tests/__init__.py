@@ -0,0 +1,4 @@
+from . import test_index_plans
+from . import test_performance
+from . import test_portal_performance
+from . import test_query_plans
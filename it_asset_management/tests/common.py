@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from odoo.tests.common import TransactionCase
+from odoo.addons.mail.tests.common import mail_new_test_user
+
+_logger = logging.getLogger(__name__)
+
+
+def perf_scales():
+    """Розміри наборів для вимірів часу (IT_ASSET_PERF_SCALES=1000,10000,100000)"""
+    value = os.environ.get('IT_ASSET_PERF_SCALES', '1000')
+    return [int(scale) for scale in value.split(',') if scale.strip()]
+
+
+class ITAssetPerfCommon(TransactionCase):
+    """Спільні дані та інструменти для тестів продуктивності"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        Category = cls.env['it.asset.category']
+        cls.category_root = Category.create({'name': 'Обладнання'})
+        cls.categories = Category.create([
+            {'name': 'Категорія %s' % index, 'parent_id': cls.category_root.id}
+            for index in range(5)
+        ])
+        cls.employees = cls.env['res.partner'].create([
+            {'name': 'Співробітник %s' % index, 'email': 'employee%s@example.com' % index}
+            for index in range(5)
+        ])
+        cls.portal_user = mail_new_test_user(
+            cls.env, login='it_portal', groups='base.group_portal', name='Portal Employee',
+            email='it_portal@example.com', password='it_portal',
+        )
+        cls.portal_partner = cls.portal_user.partner_id
+
+    def _asset_vals(self, count, employee=False, offset=0):
+        return [{
+            'name': 'Ноутбук %s' % (offset + index),
+            'category_id': self.categories[index % len(self.categories)].id,
+            'employee_id': employee and employee.id,
+            'state': 'in_use' if employee else 'available',
+            'purchase_price': 1000.0 + index,
+            'purchase_date': '2024-01-01',
+        } for index in range(count)]
+
+    def _query_count(self, func):
+        """Кількість SQL запитів, виконаних func (з урахуванням flush)"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start = self.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.cr.sql_log_count - start
+
+    def assertScaleInvariant(self, make_func, small=5, large=50, slack=2):
+        """
+        Кількість запитів не повинна залежати від кількості записів (немає N+1).
+        make_func(n) повертає функцію, що обробляє n записів.
+        """
+        queries_small = self._query_count(make_func(small))
+        queries_large = self._query_count(make_func(large))
+        self.assertLessEqual(
+            queries_large, queries_small + slack,
+            "N+1: %s запитів для %s записів проти %s для %s" % (queries_large, large, queries_small, small)
+        )
+        return queries_large
+
+    def assertQueryBudget(self, label, budget, make_func, count=100, slack=2):
+        """
+        Пакет з count записів вкладається у фіксований бюджет запитів і виконує
+        не більше запитів, ніж один запис + slack (немає N+1).
+        Виміряні значення пишуться в лог для калібрування бюджетів.
+        """
+        queries_one = self._query_count(make_func(1))
+        queries = self._query_count(make_func(count))
+        _logger.info("%s: %d запитів для %d записів, %d для одного (бюджет %d)",
+                     label, queries, count, queries_one, budget)
+        self.assertLessEqual(
+            queries, queries_one + slack,
+            "N+1 у %s: %s запитів для %s записів проти %s для одного" % (label, queries, count, queries_one)
+        )
+        self.assertLessEqual(queries, budget, "%s: %s запитів при бюджеті %s" % (label, queries, budget))
+        return queries
+
+    @contextmanager
+    def timed(self, label, count):
+        start = time.monotonic()
+        yield
+        elapsed = time.monotonic() - start
+        _logger.info("%s: %d записів за %.2f с (%.0f/с)", label, count, elapsed, count / elapsed if elapsed else 0)
@@ -0,0 +1,97 @@
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+class IndexPlanMixin:
+    """Перевірка, що запит домену виконується через індекс, а не послідовним скануванням"""
+
+    def assertIndexScan(self, model, domain, order=None, limit=None, index=None):
+        query = model._search(domain, order=order, limit=limit)
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        plan = '\n'.join(row[0] for row in self.env.cr.fetchall())
+        self.env.cr.execute("SET LOCAL enable_seqscan = on")
+        self.assertNotIn('Seq Scan on %s' % model._table, plan, plan)
+        if index:
+            self.assertIn(index, plan, plan)
+        return plan
+
+
+@tagged('post_install', '-at_install', 'it_asset_indexes')
+class TestIndexPlans(IndexPlanMixin, TransactionCase):
+    """
+    Індекси під фільтри record rules, списків порталу та історії переміщень.
+    Послідовне сканування вимикається, тому на маленькому наборі даних
+    план з "Seq Scan" означає, що придатного індексу немає.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.category = cls.env['it.asset.category'].create({'name': 'Ноутбуки'})
+        cls.employees = cls.env['res.partner'].create([
+            {'name': 'Співробітник %s' % index} for index in range(5)
+        ])
+        cls.portal_user = cls.env['res.users'].create({
+            'name': 'Portal Employee',
+            'login': 'it_index_portal',
+            'groups_id': [(6, 0, cls.env.ref('base.group_portal').ids)],
+        })
+        assets = cls.env['it.asset'].create([{
+            'name': 'Актив %s' % index,
+            'category_id': cls.category.id,
+            'serial_number': 'SN%05d' % index,
+            'employee_id': (cls.employees | cls.portal_user.partner_id)[index % 6].id,
+            'state': 'in_use',
+        } for index in range(200)])
+        cls.env['it.asset.request'].create([{
+            'requester_id': asset.employee_id.id,
+            'request_type': 'repair',
+            'asset_id': asset.id,
+            'description': 'Ремонт',
+        } for asset in assets[:50]])
+        cls.asset = assets[0]
+        cls.env.flush_all()
+        cls.env.cr.execute("ANALYZE it_asset, it_asset_movement, it_asset_request")
+
+    def test_portal_asset_list(self):
+        """Record rule employee_id = партнер + сортування списку активів на порталі"""
+        Asset = self.env['it.asset'].with_user(self.portal_user)
+        self.assertIndexScan(
+            Asset, [], order='assignment_date desc, id desc', limit=20,
+            index='it_asset_employee_assignment_index',
+        )
+        self.assertIndexScan(Asset, [('state', 'in', ['assigned', 'in_use'])])
+
+    def test_asset_filters(self):
+        """Фільтри списку активів: категорія, серійний номер, співробітник і статус"""
+        Asset = self.env['it.asset']
+        self.assertIndexScan(Asset, [('category_id', '=', self.category.id)])
+        self.assertIndexScan(Asset, [('serial_number', '=', 'SN00042')])
+        self.assertIndexScan(Asset, [
+            ('employee_id', '=', self.employees[0].id), ('state', 'in', ['assigned', 'in_use']),
+        ])
+
+    def test_portal_request_list(self):
+        """Record rule requester_id = партнер + сортування списку заявок на порталі"""
+        Request = self.env['it.asset.request'].with_user(self.portal_user)
+        self.assertIndexScan(
+            Request, [], order='request_date desc, id desc', limit=20,
+            index='it_asset_request_requester_date_index',
+        )
+
+    def test_request_filters(self):
+        """Заявки активу та фільтр за статусом"""
+        Request = self.env['it.asset.request']
+        self.assertIndexScan(Request, [('asset_id', '=', self.asset.id)])
+        self.assertIndexScan(Request, [('state', '=', 'submitted')])
+
+    def test_asset_movement_history(self):
+        """Історія переміщень активу, відсортована за датою"""
+        Movement = self.env['it.asset.movement']
+        self.assertIndexScan(
+            Movement, [('asset_id', '=', self.asset.id)], order='movement_date desc, id desc',
+            index='it_asset_movement_asset_date_index',
+        )
+        self.assertIndexScan(Movement, [('movement_date', '>=', '2024-01-01')])
@@ -0,0 +1,345 @@
+import logging
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import ITAssetPerfCommon, perf_scales
+
+_logger = logging.getLogger(__name__)
+
+#Бюджети запитів для гарячих шляхів (пакет 100 записів, кеш ORM скинуто перед виміром).
+#Ліміти не залежать від кількості записів: крім бюджету, пакет порівнюється з одним
+#записом, тому і N+1, і зростання сталої кількості запитів валять тест.
+ASSET_CREATE_BUDGET = 20
+MOVEMENT_CREATE_BUDGET = 24
+CATEGORY_COUNT_BUDGET = 4
+REQUEST_CREATE_BUDGET = 15
+REQUEST_WORKFLOW_BUDGET = 25
+
+REQUEST_ACTIONS = ('action_submit', 'action_start_progress', 'action_approve', 'action_complete')
+REQUEST_SLACK = 2
+
+
+@tagged('post_install', '-at_install', 'it_asset_perf')
+class TestAssetPerformance(ITAssetPerfCommon):
+
+    def test_asset_create(self):
+        """Створення активів: кількість запитів не залежить від розміру пакета"""
+        Asset = self.env['it.asset']
+        employee = self.employees[0]
+        self.assertQueryBudget(
+            'Створення активів', ASSET_CREATE_BUDGET,
+            lambda count: lambda: Asset.create(self._asset_vals(count, employee, offset=count)),
+        )
+
+    def test_movement_create(self):
+        """Створення переміщень разом з оновленням активів"""
+        Asset = self.env['it.asset']
+        Movement = self.env['it.asset.movement']
+        assets = Asset.create(self._asset_vals(101, self.employees[0]))
+        batches = iter([assets[:1], assets[1:]])
+
+        def move(count):
+            batch = next(batches)
+            self.assertEqual(len(batch), count)
+            return lambda: Movement.create([{
+                'asset_id': asset.id,
+                'employee_id': self.employees[1].id,
+                'movement_type': 'transfer',
+            } for asset in batch])
+
+        self.assertQueryBudget('Переміщення', MOVEMENT_CREATE_BUDGET, move)
+        self.assertEqual(set(assets.mapped('employee_id').ids), {self.employees[1].id})
+
+    def test_movement_chain_in_batch(self):
+        """Кілька переміщень одного активу в пакеті: попередній співробітник береться з попереднього переміщення"""
+        first, second, third = self.employees[:3]
+        asset = self.env['it.asset'].create(self._asset_vals(1, first))
+        movements = self.env['it.asset.movement'].create([{
+            'asset_id': asset.id,
+            'employee_id': third.id,
+            'movement_date': '2024-03-01',
+        }, {
+            'asset_id': asset.id,
+            'employee_id': second.id,
+            'movement_date': '2024-02-01',
+        }])
+        self.assertEqual(movements[1].previous_employee_id, first)
+        self.assertEqual(movements[0].previous_employee_id, second)
+        self.assertEqual(asset.employee_id, third)
+
+    def test_backdated_assignment(self):
+        """Призначення з датою в минулому створює переміщення і інтервал володіння з цієї дати"""
+        asset = self.env['it.asset'].create(self._asset_vals(1))
+        asset.write({'employee_id': self.employees[0].id, 'assignment_date': '2024-05-01'})
+        self.assertEqual(asset.movement_ids.movement_date, date(2024, 5, 1))
+        self.assertEqual(asset.holder_at('2024-05-02')[asset.id], self.employees[0])
+
+    def test_label_images(self):
+        """Зображення етикетки генеруються при першому використанні і тільки після зміни коду"""
+        asset = self.env['it.asset'].create(self._asset_vals(1))
+        self.assertFalse(asset.label_code)
+        asset._ensure_label_images()
+        self.assertEqual(asset.label_code, asset.code)
+        self.assertTrue(asset.qr_image and asset.barcode_image)
+        qr_image = asset.qr_image
+        with self.assertQueryCount(0):
+            asset._ensure_label_images()
+
+        asset.code = 'IT-LABEL-1'
+        asset._ensure_label_images()
+        self.assertEqual(asset.label_code, 'IT-LABEL-1')
+        self.assertNotEqual(asset.qr_image, qr_image)
+
+    def test_warranty_expiry_cron(self):
+        """Повторний запуск нагадувань про гарантію не створює дублікатів активностей і листів"""
+        Asset = self.env['it.asset']
+        today = fields.Date.context_today(Asset)
+        manager = self.env.ref('base.user_admin')
+        self.categories[0].responsible_id = manager
+        assets = Asset.create([
+            dict(vals, category_id=self.categories[0].id, warranty_end_date=today + timedelta(days=days))
+            for vals, days in zip(self._asset_vals(3), (5, 20, 400))
+        ])
+        activity_type = self.env.ref('it_asset_management.mail_activity_warranty_expiry')
+
+        with patch.object(self.cr, 'commit'):
+            Asset._cron_warranty_expiry()
+            Asset._cron_warranty_expiry()
+
+        activities = self.env['mail.activity'].search([
+            ('res_model', '=', 'it.asset'), ('res_id', 'in', assets.ids),
+            ('activity_type_id', '=', activity_type.id),
+        ])
+        self.assertEqual(activities.mapped('res_id'), assets[:2].ids)
+        self.assertEqual(set(activities.user_id.ids), {manager.id})
+        self.assertEqual(assets[:2].mapped('warranty_notified_date'), assets[:2].mapped('warranty_end_date'))
+        self.assertFalse(assets[2].warranty_notified_date)
+        #Один зведений лист, в якому є обидва активи
+        digests = self.env['mail.message'].sudo().search([
+            ('subject', 'like', 'Закінчення гарантії'), ('body', 'like', assets[0].code),
+        ])
+        self.assertEqual(len(digests), 1)
+        self.assertIn(assets[1].code, digests.body)
+        self.assertNotIn(assets[2].code, digests.body)
+
+    def test_depreciation_reset(self):
+        """Активи категорії, що перестала амортизуватись, повертаються до ціни придбання"""
+        category = self.categories[0]
+        category.write({'depreciation_method': 'linear', 'depreciation_months': 36})
+        asset = self.env['it.asset'].create(dict(self._asset_vals(1)[0], purchase_price=1000.0))
+        Depreciation = self.env['it.asset.depreciation']
+        Depreciation._compute_snapshots('2025-01-31')
+        self.assertAlmostEqual(asset.book_value, 666.67)
+
+        category.depreciation_method = 'none'
+        Depreciation._compute_snapshots('2025-01-31')
+        self.assertEqual(asset.book_value, 1000.0)
+
+    def test_category_asset_count(self):
+        """Лічильник активів категорій - один GROUP BY на весь набір"""
+        Category = self.env['it.asset.category']
+        categories = Category.create([{'name': 'Група %s' % index} for index in range(50)])
+        self.env['it.asset'].create([
+            dict(vals, category_id=categories[index % 50].id)
+            for index, vals in enumerate(self._asset_vals(200))
+        ])
+
+        def count_assets(count):
+            return lambda: categories[:count].mapped('asset_count')
+
+        self.assertQueryBudget('Лічильник категорій', CATEGORY_COUNT_BUDGET, count_assets, count=50)
+
+    def _request_workflow_counts(self, asset):
+        """Кількість запитів кожного кроку циклу заявки та відхилення"""
+        Request = self.env['it.asset.request']
+        requests = []
+        counts = {'create': self._query_count(lambda: requests.append(Request.create({
+            'requester_id': asset.employee_id.id,
+            'request_type': 'repair',
+            'asset_id': asset.id,
+            'description': 'Не вмикається',
+        })))}
+        request = requests[0]
+        for action in REQUEST_ACTIONS:
+            counts[action] = self._query_count(getattr(request, action))
+        self.assertEqual(request.state, 'done')
+
+        rejected = Request.create({
+            'requester_id': asset.employee_id.id,
+            'request_type': 'new',
+            'category_id': self.categories[0].id,
+            'description': 'Потрібен монітор',
+        })
+        counts['action_reject'] = self._query_count(rejected.action_reject)
+        return counts
+
+    def test_request_workflow(self):
+        """Кожен крок циклу заявки вкладається в бюджет і не залежить від історії співробітника"""
+        employee = self.employees[0]
+        asset = self.env['it.asset'].create(self._asset_vals(1, employee))
+        #Перший прогін прогріває кеші шаблонів і ormcache
+        self._request_workflow_counts(asset)
+        baseline = self._request_workflow_counts(asset)
+
+        assets = self.env['it.asset'].create(self._asset_vals(50, employee, offset=1))
+        self.env['it.asset.request'].create([{
+            'requester_id': employee.id,
+            'request_type': 'repair',
+            'asset_id': other.id,
+            'description': 'Заявка %s' % other.name,
+        } for other in assets])
+        counts = self._request_workflow_counts(asset)
+        _logger.info("Цикл заявки: %s (без історії: %s)", counts, baseline)
+        for step, queries in counts.items():
+            with self.subTest(step=step):
+                self.assertLessEqual(
+                    queries, baseline[step] + REQUEST_SLACK,
+                    "%s: %s запитів проти %s без історії" % (step, queries, baseline[step])
+                )
+                budget = REQUEST_CREATE_BUDGET if step == 'create' else REQUEST_WORKFLOW_BUDGET
+                self.assertLessEqual(queries, budget, "%s: %s запитів при бюджеті %s" % (step, queries, budget))
+
+    def test_portal_option_cache(self):
+        """Опції форми заявки беруться з кешу, поки категорії і закріплені активи не змінились"""
+        Asset = self.env['it.asset']
+        Category = self.env['it.asset.category']
+        partner = self.portal_partner
+        Asset.create(self._asset_vals(3, partner))
+        self.assertEqual(len(Asset._portal_request_options(partner)), 3)
+        Category._portal_options()
+        with self.assertQueryCount(0):
+            Asset._portal_request_options(partner)
+            Category._portal_options()
+
+        #Поля, що не входять в опції, кеш не скидають
+        self.category_root.code = 'ROOT'
+        with self.assertQueryCount(0):
+            Category._portal_options()
+
+        Asset.create(self._asset_vals(1, partner, offset=10))
+        self.assertEqual(len(Asset._portal_request_options(partner)), 4)
+        self.category_root.name = 'Техніка'
+        self.assertIn('Техніка / Категорія 0', [name for __, name in Category._portal_options()])
+
+    def test_allocation_run(self):
+        """Розподіл активів: кількість запитів не залежить від кількості заявок"""
+        Request = self.env['it.asset.request']
+        subcategory = self.categories[0]
+
+        def allocate(count):
+            self.env['it.asset'].create([
+                dict(vals, category_id=subcategory.id, state='available')
+                for vals in self._asset_vals(count)
+            ])
+            Request.create([{
+                'requester_id': self.employees[index % len(self.employees)].id,
+                'request_type': 'new',
+                'category_id': self.category_root.id,
+                'description': 'Новий ноутбук',
+                'state': 'approved',
+            } for index in range(count + 2)])
+            allocation = self.env['it.asset.allocation'].create({'name': 'Розподіл %s' % count})
+            return allocation.action_run
+
+        self.assertScaleInvariant(allocate, slack=4)
+        allocation = self.env['it.asset.allocation'].search([], limit=1)
+        self.assertEqual(allocation.allocated_count, 50)
+        #2 незадоволені заявки першого запуску + 2 нові
+        self.assertEqual(allocation.unmet_count, 4)
+        self.assertEqual(allocation.shortage_ids.category_id, self.category_root)
+
+    def test_archive_roundtrip(self):
+        """Архівація списаних активів не залежить від їх кількості, відновлення повертає історію"""
+        Asset = self.env['it.asset']
+        Archive = self.env['it.asset.archive']
+
+        def archive(count):
+            assets = Asset.create(self._asset_vals(count, self.employees[0], offset=count * 10))
+            assets.move_to_employee(self.employees[1], movement_type='transfer')
+            assets.action_retire()
+            return lambda: Archive._archive_assets(assets.ids)
+
+        self.assertScaleInvariant(archive)
+        archived = Archive.search([], order='res_id desc', limit=1)
+        self.assertEqual(archived.movement_count, 2)
+        self.assertFalse(Asset.with_context(active_test=False).browse(archived.res_id).exists())
+        #Інтервали володіння лишаються для запитів на дату
+        today = fields.Date.context_today(Asset)
+        self.assertIn(archived, Archive.search_held_by(self.employees[1], today))
+
+        archived.action_restore()
+        asset = Asset.with_context(active_test=False).browse(archived.res_id)
+        self.assertEqual(asset.state, 'retired')
+        self.assertEqual(len(asset.movement_ids), 2)
+        self.assertEqual(asset.holder_at(today)[asset.id], self.employees[1])
+        self.assertFalse(archived.exists())
+
+    def test_custody_as_of(self):
+        """Інтервали володіння враховують переміщення заднім числом, запит на дату не залежить від кількості"""
+        Asset = self.env['it.asset']
+        Movement = self.env['it.asset.movement']
+        first, second, backdated = self.employees[:3]
+        assets = Asset.create(self._asset_vals(50))
+        for employee, day, batch in [(first, '2024-01-01', assets), (second, '2024-06-01', assets),
+                                     (backdated, '2024-03-01', assets[:5])]:
+            Movement.create([{
+                'asset_id': asset.id,
+                'employee_id': employee.id,
+                'movement_date': day,
+                'movement_type': 'transfer',
+            } for asset in batch])
+
+        self.assertEqual(set(assets.holder_at('2024-02-01').values()), {first})
+        holders = assets.holder_at('2024-04-01')
+        self.assertEqual({holders[asset.id] for asset in assets[:5]}, {backdated})
+        self.assertEqual({holders[asset.id] for asset in assets[5:]}, {first})
+        self.assertEqual(set(assets.holder_at('2024-07-01').values()), {second})
+        self.assertFalse(assets[0].holder_at('2023-12-31')[assets[0].id])
+        self.assertEqual(Asset.search_held_by(backdated, '2024-04-01'), assets[:5])
+
+        self.assertScaleInvariant(lambda count: lambda: assets[:count].holder_at('2024-04-01'))
+
+    def test_hot_paths_at_scale(self):
+        """
+        Бюджети гарячих шляхів на наповненій базі (1k/10k/100k активів).
+        Розміри задаються змінною IT_ASSET_PERF_SCALES, час пишеться в лог.
+        """
+        Asset = self.env['it.asset']
+        seeded = 0
+        for scale in sorted(perf_scales()):
+            with self.subTest(scale=scale):
+                with self.timed('Наповнення до %s активів' % scale, scale - seeded):
+                    Asset.create_batch([
+                        dict(vals, employee_id=self.employees[index % len(self.employees)].id, state='in_use')
+                        for index, vals in enumerate(self._asset_vals(scale - seeded, offset=seeded))
+                    ])
+                seeded = scale
+                self.env.invalidate_all()
+
+                with self.timed('Створення активів при %s' % scale, 100):
+                    self.assertQueryBudget(
+                        'Створення активів при %s' % scale, ASSET_CREATE_BUDGET,
+                        lambda count: lambda: Asset.create(
+                            self._asset_vals(count, self.employees[0], offset=seeded + count)
+                        ),
+                    )
+
+                def move(count):
+                    assets = Asset.create(self._asset_vals(count, self.employees[0], offset=seeded + 1000 + count))
+                    return lambda: self.env['it.asset.movement'].create([{
+                        'asset_id': asset.id,
+                        'employee_id': self.employees[1].id,
+                        'movement_type': 'transfer',
+                    } for asset in assets])
+
+                with self.timed('Переміщення при %s' % scale, 100):
+                    self.assertQueryBudget('Переміщення при %s' % scale, MOVEMENT_CREATE_BUDGET, move)
+                categories = self.category_root | self.categories
+                with self.timed('Лічильник категорій при %s' % scale, len(categories)):
+                    self.assertQueryBudget(
+                        'Лічильник категорій при %s' % scale, CATEGORY_COUNT_BUDGET,
+                        lambda count: lambda: categories[:count].mapped('asset_count'), count=len(categories),
+                    )
@@ -0,0 +1,103 @@
+import json
+
+from odoo import http
+from odoo.tests import HttpCase, tagged
+
+from .common import ITAssetPerfCommon
+
+#Бюджети запитів на "гарячий" запит (кеші шаблонів і ormcache вже прогріті).
+#Крім бюджету, після наповнення допускається лише PORTAL_SLACK запитів понад 3-5 записів
+PORTAL_HOME_BUDGET = 25
+PORTAL_COUNTERS_BUDGET = 12
+PORTAL_LIST_BUDGET = 30
+PORTAL_CREATE_BUDGET = 55
+PORTAL_SLACK = 2
+
+PORTAL_ROUTES = {
+    '/my': PORTAL_HOME_BUDGET,
+    '/my/assets': PORTAL_LIST_BUDGET,
+    '/my/asset-requests': PORTAL_LIST_BUDGET,
+    '/my/asset-requests/new': PORTAL_LIST_BUDGET,
+}
+PORTAL_COUNTERS = ['it_asset_count', 'it_asset_request_count']
+
+
+@tagged('post_install', '-at_install', 'it_asset_perf')
+class TestPortalPerformance(HttpCase, ITAssetPerfCommon):
+
+    def _hot_query_count(self, url):
+        """Кількість запитів другого звернення до url (перше прогріває кеші)"""
+        self.url_open(url)
+        return self._query_count(lambda: self.assertEqual(self.url_open(url).status_code, 200))
+
+    def _seed_portal_records(self, count, offset=0):
+        assets = self.env['it.asset'].create(self._asset_vals(count, self.portal_partner, offset=offset))
+        self.env['it.asset.request'].create([{
+            'requester_id': self.portal_partner.id,
+            'request_type': 'repair',
+            'asset_id': asset.id,
+            'description': 'Заявка %s' % asset.name,
+        } for asset in assets])
+
+    def _portal_counters(self):
+        """Лічильники головної сторінки, як їх завантажує /my (JSON маршрут /my/counters)"""
+        response = self.url_open('/my/counters', data=json.dumps({
+            'jsonrpc': '2.0', 'method': 'call', 'id': 1, 'params': {'counters': PORTAL_COUNTERS},
+        }), headers={'Content-Type': 'application/json'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['result']
+
+    def test_portal_routes(self):
+        """Сторінки порталу вкладаються в бюджет і не виконують запит на кожен рядок"""
+        self.authenticate('it_portal', 'it_portal')
+        self._seed_portal_records(3)
+        small = {url: self._hot_query_count(url) for url in PORTAL_ROUTES}
+        self._seed_portal_records(17, offset=3)
+        for url, budget in PORTAL_ROUTES.items():
+            with self.subTest(url=url):
+                with self.timed('Портал %s' % url, 20):
+                    queries = self._hot_query_count(url)
+                self.assertLessEqual(
+                    queries, small[url] + PORTAL_SLACK, "N+1 на %s: %s проти %s" % (url, queries, small[url])
+                )
+                self.assertLessEqual(queries, budget, "%s: %s запитів при бюджеті %s" % (url, queries, budget))
+
+    def test_portal_counters(self):
+        """Лічильники /my/counters читаються з партнера, без COUNT по активах і заявках"""
+        self.authenticate('it_portal', 'it_portal')
+        self._seed_portal_records(3)
+        self._portal_counters()
+        small = self._query_count(self._portal_counters)
+        self._seed_portal_records(17, offset=3)
+        self._portal_counters()
+        results = []
+        queries = self._query_count(lambda: results.append(self._portal_counters()))
+        self.assertEqual(
+            {key: results[0][key] for key in PORTAL_COUNTERS},
+            {'it_asset_count': 20, 'it_asset_request_count': 20},
+        )
+        self.assertLessEqual(queries, small + PORTAL_SLACK, "N+1: %s проти %s" % (queries, small))
+        self.assertLessEqual(queries, PORTAL_COUNTERS_BUDGET)
+
+    def test_portal_create_request(self):
+        """Створення заявки з порталу вкладається в бюджет і не залежить від кількості записів співробітника"""
+        self._seed_portal_records(5)
+        self.authenticate('it_portal', 'it_portal')
+        data = {
+            'request_type': 'new',
+            'category_id': self.categories[0].id,
+            'description': 'Потрібен ноутбук',
+            'priority': '1',
+            'csrf_token': http.Request.csrf_token(self),
+        }
+        self.url_open('/my/asset-requests/create', data=data)
+        small = self._query_count(lambda: self.url_open('/my/asset-requests/create', data=data))
+        self._seed_portal_records(20, offset=5)
+        queries = self._query_count(lambda: self.url_open('/my/asset-requests/create', data=data))
+        self.assertLessEqual(queries, small + PORTAL_SLACK, "N+1: %s проти %s" % (queries, small))
+        self.assertLessEqual(queries, PORTAL_CREATE_BUDGET)
+        self.assertEqual(
+            self.env['it.asset.request'].search_count([
+                ('requester_id', '=', self.portal_partner.id), ('request_type', '=', 'new'),
+            ]), 3
+        )
@@ -0,0 +1,55 @@
+from odoo.tests import tagged
+from odoo.tools import sql
+
+from .common import ITAssetPerfCommon
+from .test_index_plans import IndexPlanMixin
+
+
+@tagged('post_install', '-at_install', 'it_asset_perf')
+class TestQueryPlans(IndexPlanMixin, ITAssetPerfCommon):
+    """
+    Запити ієрархії категорій, пошуку і володіння на дату повинні йти через індекси
+    (індекси record rules і списків порталу перевіряє test_index_plans).
+    Послідовне сканування вимикається, тому на маленькому наборі даних
+    план з "Seq Scan" означає, що придатного індексу немає.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        assets = cls.env['it.asset'].create([{
+            'name': 'Актив %s' % index,
+            'category_id': cls.categories[index % len(cls.categories)].id,
+            'employee_id': cls.employees[index % len(cls.employees)].id,
+            'state': 'in_use',
+        } for index in range(200)])
+        cls.env['it.asset.request'].create([{
+            'requester_id': asset.employee_id.id,
+            'request_type': 'repair',
+            'asset_id': asset.id,
+            'description': 'Ремонт',
+        } for asset in assets[:50]])
+        cls.env.flush_all()
+        cls.env.cr.execute("ANALYZE it_asset, it_asset_movement, it_asset_custody, it_asset_request, it_asset_category")
+
+    def test_category_subtree(self):
+        self.assertIndexScan(self.env['it.asset.category'], [('id', 'child_of', self.category_root.id)])
+        self.assertIndexScan(self.env['it.asset'], [('category_id', 'child_of', self.category_root.id)])
+
+    def test_text_search(self):
+        if not sql.has_trigram(self.env.cr):
+            self.skipTest("pg_trgm не встановлено")
+        self.assertIndexScan(self.env['it.asset'], [('serial_number', 'ilike', '0042')])
+        self.assertIndexScan(self.env['it.asset'], self.env['it.asset']._text_search_domain('Latitude'))
+
+    def test_custody_as_of(self):
+        """Запит "у кого був актив на дату" йде по GiST індексу інтервалів"""
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.env.cr.execute("""
+            EXPLAIN SELECT asset_id, employee_id
+                      FROM it_asset_custody
+                     WHERE daterange(valid_from, valid_to, '[)') @> CURRENT_DATE
+        """)
+        plan = '\n'.join(row[0] for row in self.env.cr.fetchall())
+        self.env.cr.execute("SET LOCAL enable_seqscan = on")
+        self.assertIn('it_asset_custody_period_index', plan, plan)
@@ -0,0 +1,2 @@
+from . import it_asset_reassign_wizard
+from . import it_asset_dataset_wizard
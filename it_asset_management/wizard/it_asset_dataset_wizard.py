@@ -0,0 +1,319 @@
+import logging
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+#Кількість активів, що вставляються одним пакетом
+DATASET_BATCH_SIZE = 20000
+#Максимальна довжина ланцюжка переміщень одного активу
+MAX_MOVEMENT_CHAIN = 12
+
+MANUFACTURERS = {
+    'Dell': ['Latitude 5440', 'OptiPlex 7010', 'PowerEdge R650'],
+    'HP': ['EliteBook 840', 'ProDesk 400', 'LaserJet M404'],
+    'Lenovo': ['ThinkPad T14', 'ThinkCentre M70', 'ThinkSystem SR630'],
+    'Apple': ['MacBook Pro 14', 'iPhone 15', 'iPad Air'],
+    'Cisco': ['Catalyst 9200', 'IP Phone 8841'],
+}
+
+#Розподіли статусів (значення, вага)
+ASSET_STATES = [('in_use', 70), ('assigned', 8), ('available', 12), ('maintenance', 5), ('retired', 5)]
+REQUEST_STATES = [
+    ('draft', 5), ('submitted', 15), ('in_progress', 15), ('approved', 5),
+    ('done', 45), ('rejected', 10), ('cancelled', 5),
+]
+REQUEST_TYPES = [('new', 30), ('repair', 50), ('replacement', 20)]
+PRIORITIES = [('0', 20), ('1', 50), ('2', 22), ('3', 8)]
+
+
+def _weighted(choices):
+    """Пара (значення, накопичені ваги) для random.choices"""
+    values, weights = zip(*choices)
+    return list(values), list(accumulate(weights))
+
+
+class ITAssetDatasetWizard(models.TransientModel):
+    """
+    Генератор синтетичного набору даних для відтворення продакшн-обсягів.
+    Категорії (глибоке дерево) та співробітники створюються через ORM,
+    активи, переміщення і заявки - пакетними INSERT (execute_values)
+    з номерами, зарезервованими блоками з послідовностей.
+    Зображення етикеток не створюються: вони генеруються при першому відкритті форми або друку.
+
+    Запуск без інтерфейсу:
+        odoo-bin shell -d db
+        >>> env['it.asset.dataset.wizard'].create({'asset_count': 1000000}).action_generate()
+        >>> env.cr.commit()
+    """
+    _name = 'it.asset.dataset.wizard'
+    _description = 'IT Asset Synthetic Dataset Generator'
+
+    asset_count = fields.Integer(
+        string='Кількість активів',
+        required=True,
+        default=100000
+    )
+
+    employee_count = fields.Integer(
+        string='Кількість співробітників',
+        required=True,
+        default=1000
+    )
+
+    category_depth = fields.Integer(
+        string='Глибина дерева категорій',
+        required=True,
+        default=4
+    )
+
+    category_breadth = fields.Integer(
+        string='Підкатегорій на рівні',
+        required=True,
+        default=4
+    )
+
+    movements_per_asset = fields.Float(
+        string='Переміщень на актив (в середньому)',
+        required=True,
+        default=2.0
+    )
+
+    requests_per_asset = fields.Float(
+        string='Заявок на актив',
+        required=True,
+        default=0.2
+    )
+
+    employee_skew = fields.Float(
+        string='Нерівномірність розподілу',
+        required=True,
+        default=1.0,
+        help='Показник Zipf для розподілу активів і заявок між співробітниками: '
+             '0 - рівномірно, більше значення - більше записів у "важких" співробітників'
+    )
+
+    seed = fields.Integer(
+        string='Seed',
+        default=42,
+        help='Однаковий seed дає однаковий набір даних'
+    )
+
+    def action_generate(self):
+        """Генерація набору даних з параметрами майстра"""
+        self.ensure_one()
+        if self.asset_count <= 0 or self.employee_count <= 0:
+            raise UserError(_('Кількість активів і співробітників має бути додатною.'))
+        if self.category_depth <= 0 or self.category_breadth <= 0:
+            raise UserError(_('Глибина та ширина дерева категорій мають бути додатними.'))
+
+        started = time.monotonic()
+        rng = random.Random(self.seed)
+        employee_ids = self._generate_employees()
+        leaves = self._generate_categories(rng)
+        stats = self._generate_assets(rng, employee_ids, leaves)
+        self._refresh_counters(employee_ids)
+
+        elapsed = time.monotonic() - started
+        _logger.info(
+            "it.asset: згенеровано %d активів, %d переміщень, %d заявок за %.1f с",
+            stats['assets'], stats['movements'], stats['requests'], elapsed
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Набір даних згенеровано'),
+                'message': _('%(assets)s активів, %(movements)s переміщень, %(requests)s заявок за %(seconds)s с',
+                             seconds=round(elapsed), **stats),
+                'type': 'success',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _generate_employees(self):
+        """Співробітники створюються пакетами через ORM без трекінгу"""
+        Partner = self.env['res.partner'].with_context(tracking_disable=True, mail_create_nolog=True)
+        employee_ids = []
+        for start in range(0, self.employee_count, DATASET_BATCH_SIZE):
+            stop = min(start + DATASET_BATCH_SIZE, self.employee_count)
+            employee_ids += Partner.create([{
+                'name': 'Synthetic Employee %06d' % index,
+                'email': 'synthetic.employee%06d@example.com' % index,
+            } for index in range(start, stop)]).ids
+        return employee_ids
+
+    def _generate_categories(self, rng):
+        """
+        Дерево категорій створюється по рівнях (один create на рівень),
+        parent_path і complete_name заповнює ORM. Повертає листові категорії.
+        """
+        Category = self.env['it.asset.category']
+        methods = ['none', 'linear', 'degressive']
+        level = Category.create([{
+            'name': 'Synthetic %s' % manufacturer,
+            'depreciation_method': rng.choice(methods),
+            'depreciation_months': rng.choice([24, 36, 48, 60]),
+        } for manufacturer in MANUFACTURERS])
+        for depth in range(1, self.category_depth):
+            level = Category.create([{
+                'name': 'Рівень %s.%s' % (depth, index),
+                'parent_id': parent.id,
+            } for parent in level for index in range(self.category_breadth)])
+        self.env.flush_all()
+        return [(category.id, category.name) for category in level]
+
+    def _generate_assets(self, rng, employee_ids, leaves):
+        """Активи з ланцюжками переміщень і заявками, пакетами по DATASET_BATCH_SIZE"""
+        cr = self.env.cr
+        Sequence = self.env['ir.sequence']
+        uid, now = self.env.uid, fields.Datetime.now()
+        today = fields.Date.context_today(self)
+        employee_cum = list(accumulate(1.0 / (rank + 1) ** self.employee_skew for rank in range(len(employee_ids))))
+        asset_states, asset_state_cum = _weighted(ASSET_STATES)
+        request_states, request_state_cum = _weighted(REQUEST_STATES)
+        request_types, request_type_cum = _weighted(REQUEST_TYPES)
+        priorities, priority_cum = _weighted(PRIORITIES)
+        stats = {'assets': 0, 'movements': 0, 'requests': 0}
+
+        for start in range(0, self.asset_count, DATASET_BATCH_SIZE):
+            size = min(DATASET_BATCH_SIZE, self.asset_count - start)
+            codes = Sequence.next_block_by_code('it.asset', size)
+            employees = rng.choices(employee_ids, cum_weights=employee_cum, k=size)
+            states = rng.choices(asset_states, cum_weights=asset_state_cum, k=size)
+
+            asset_rows = []
+            for index, (code, employee_id, state) in enumerate(zip(codes, employees, states)):
+                manufacturer = rng.choice(list(MANUFACTURERS))
+                model = rng.choice(MANUFACTURERS[manufacturer])
+                category_id, category_name = rng.choice(leaves)
+                purchase_date = today - timedelta(days=rng.randint(30, 5 * 365))
+                price = round(rng.uniform(100, 5000), 2)
+                holder = employee_id if state in ('assigned', 'in_use') else None
+                assignment_date = purchase_date + timedelta(days=rng.randint(0, (today - purchase_date).days)) \
+                    if holder else None
+                asset_rows.append((
+                    '%s %s' % (manufacturer, model), code, code,
+                    category_id, 'SN%010d' % (start + index), manufacturer,
+                    purchase_date, price, price, purchase_date + timedelta(days=rng.choice([365, 730, 1095])),
+                    state, holder, assignment_date, state != 'retired', model,
+                    uid, now, uid, now,
+                ))
+            asset_ids = [row[0] for row in execute_values(cr._obj, """
+                INSERT INTO it_asset
+                       (name, code, qr_code, category_id, serial_number, manufacturer,
+                        purchase_date, purchase_price, book_value, warranty_end_date,
+                        state, employee_id, assignment_date, active, model,
+                        create_uid, create_date, write_uid, write_date)
+                VALUES %s
+                RETURNING id
+            """, asset_rows, page_size=5000, fetch=True)]
+
+            stats['movements'] += self._insert_movements(rng, employee_ids, employee_cum, asset_ids, asset_rows, leaves)
+            self.env['it.asset.custody']._rebuild(asset_ids)
+
+            request_rows = []
+            for asset_id, row in zip(asset_ids, asset_rows):
+                if rng.random() >= self.requests_per_asset:
+                    continue
+                request_type = rng.choices(request_types, cum_weights=request_type_cum)[0]
+                state = rng.choices(request_states, cum_weights=request_state_cum)[0]
+                request_date = row[6] + timedelta(days=rng.randint(0, (today - row[6]).days))
+                requester_id = row[11] or rng.choices(employee_ids, cum_weights=employee_cum)[0]
+                completion_date = request_date + timedelta(days=rng.randint(0, 30)) if state == 'done' else None
+                request_rows.append([
+                    request_type, requester_id,
+                    asset_id if request_type != 'new' else None,
+                    row[3] if request_type == 'new' else None,
+                    'Синтетична заявка для %s' % row[1], state,
+                    rng.choices(priorities, cum_weights=priority_cum)[0],
+                    uid if state not in ('draft', 'submitted') else None,
+                    request_date, min(completion_date, today) if completion_date else None,
+                    uid, now, uid, now,
+                ])
+            for row, name in zip(request_rows, Sequence.next_block_by_code('it.asset.request', len(request_rows))):
+                row.insert(0, name)
+            if request_rows:
+                request_ids = [row[0] for row in execute_values(cr._obj, """
+                    INSERT INTO it_asset_request
+                           (name, request_type, requester_id, asset_id, category_id, description, state,
+                            priority, assigned_to_id, request_date, completion_date,
+                            create_uid, create_date, write_uid, write_date)
+                    VALUES %s
+                    RETURNING id
+                """, request_rows, page_size=5000, fetch=True)]
+                #Термін і прострочення SLA для згенерованих заявок
+                self.env['it.asset.request']._refresh_sla(request_ids)
+
+            stats['assets'] += size
+            stats['requests'] += len(request_rows)
+            _logger.info("it.asset: згенеровано %d з %d активів", stats['assets'], self.asset_count)
+        return stats
+
+    def _insert_movements(self, rng, employee_ids, employee_cum, asset_ids, asset_rows, leaves):
+        """
+        Ланцюжок переміщень для кожного закріпленого активу: від першого
+        призначення до поточного співробітника, дати зростають від дати
+        придбання до дати призначення.
+        """
+        category_names = dict(leaves)
+        uid, now = self.env.uid, fields.Datetime.now()
+        movement_rows = []
+        for asset_id, row in zip(asset_ids, asset_rows):
+            holder, assignment_date = row[11], row[12]
+            if not holder:
+                continue
+            length = min(MAX_MOVEMENT_CHAIN, 1 + int(rng.expovariate(1.0 / max(self.movements_per_asset - 1, 0.01))))
+            chain = rng.choices(employee_ids, cum_weights=employee_cum, k=length - 1) + [holder]
+            span = max((assignment_date - row[6]).days, 0)
+            offsets = sorted(rng.randint(0, span) for __ in range(length - 1)) + [span]
+            previous = None
+            for employee_id, offset in zip(chain, offsets):
+                if employee_id == previous:
+                    continue
+                movement_rows.append([
+                    asset_id, previous, employee_id, row[6] + timedelta(days=offset),
+                    'transfer' if previous else 'assignment', uid, row[1], category_names[row[3]],
+                    uid, now, uid, now,
+                ])
+                previous = employee_id
+        names = self.env['ir.sequence'].next_block_by_code('it.asset.movement', len(movement_rows))
+        for movement, name in zip(movement_rows, names):
+            movement.insert(0, name)
+        if movement_rows:
+            execute_values(self.env.cr._obj, """
+                INSERT INTO it_asset_movement
+                       (name, asset_id, previous_employee_id, employee_id, movement_date, movement_type,
+                        user_id, asset_code, asset_category,
+                        create_uid, create_date, write_uid, write_date)
+                VALUES %s
+            """, movement_rows, page_size=5000)
+        return len(movement_rows)
+
+    def _refresh_counters(self, employee_ids):
+        """Збережені лічильники партнерів і статистика планувальника після вставки в обхід ORM"""
+        cr = self.env.cr
+        cr.execute("""
+            UPDATE res_partner partner
+               SET it_asset_count = COALESCE(assets.count, 0),
+                   it_asset_request_count = COALESCE(requests.count, 0)
+              FROM unnest(%s) AS employee(id)
+         LEFT JOIN (SELECT employee_id, count(*) AS count
+                      FROM it_asset
+                     WHERE employee_id = ANY(%s) AND state IN ('assigned', 'in_use')
+                  GROUP BY employee_id) assets ON assets.employee_id = employee.id
+         LEFT JOIN (SELECT requester_id, count(*) AS count
+                      FROM it_asset_request
+                     WHERE requester_id = ANY(%s)
+                  GROUP BY requester_id) requests ON requests.requester_id = employee.id
+             WHERE partner.id = employee.id
+        """, (employee_ids, employee_ids, employee_ids))
+        cr.execute("ANALYZE it_asset, it_asset_movement, it_asset_custody, it_asset_request, it_asset_category")
+        self.env.invalidate_all()
@@ -0,0 +1,61 @@
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+
+
+class ITAssetReassignWizard(models.TransientModel):
+    """
+    Майстер масового переміщення активів до іншого співробітника.
+    Викликається зі списку активів (звільнення, переїзд відділу).
+    """
+    _name = 'it.asset.reassign.wizard'
+    _description = 'IT Asset Bulk Reassignment'
+
+    asset_ids = fields.Many2many(
+        'it.asset',
+        string='Активи',
+        required=True,
+        default=lambda self: self.env.context.get('active_ids', [])
+    )
+
+    employee_id = fields.Many2one(
+        'res.partner',
+        string='Новий співробітник',
+        required=True,
+        domain=[('is_company', '=', False)]
+    )
+
+    movement_date = fields.Date(
+        string='Дата переміщення',
+        required=True,
+        default=fields.Date.context_today
+    )
+
+    movement_type = fields.Selection([
+        ('assignment', 'Призначення'),
+        ('transfer', 'Передача'),
+        ('return', 'Повернення'),
+        ('maintenance', 'На ремонт')
+    ], string='Тип переміщення', help='Якщо не вказано - визначається автоматично')
+
+    reason = fields.Text(
+        string='Причина переміщення'
+    )
+
+    def action_confirm(self):
+        """Створення всіх переміщень одним пакетом"""
+        self.ensure_one()
+        movements = self.asset_ids.move_to_employee(
+            self.employee_id,
+            movement_type=self.movement_type,
+            reason=self.reason,
+            movement_date=self.movement_date,
+        )
+        if not movements:
+            raise UserError(_('Всі обрані активи вже закріплені за цим співробітником.'))
+        return {
+            'name': _('Переміщення активів'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'it.asset.movement',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', movements.ids)],
+        }